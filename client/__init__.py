@@ -1,22 +1,30 @@
+import atexit
 import logging
+import logging.handlers
 
 from .globals import Side
-from .trading_app import (cancel, connect, create_iceberg, disconnect, revise,
-                          status)
+from .trading_app import (cancel, connect, create_iceberg, create_icebergs,
+                          disconnect, revise, status)
 
-logging.basicConfig(
-    filename="trading_app.log",
-    filemode="w",
-    format="%(asctime)s:%(levelname)s:%(module)s:%(lineno)d:%(message)s",
-    encoding="utf-8",
-    level=logging.INFO,
+# Records are buffered and written to the file in batches, or right away for
+# errors, instead of one write per record.
+_file_handler = logging.FileHandler("trading_app.log", mode="w", encoding="utf-8")
+_file_handler.setFormatter(
+    logging.Formatter("%(asctime)s:%(levelname)s:%(module)s:%(lineno)d:%(message)s")
 )
+_log_handler = logging.handlers.MemoryHandler(
+    capacity=1000, flushLevel=logging.ERROR, target=_file_handler
+)
+logging.root.addHandler(_log_handler)
+logging.root.setLevel(logging.INFO)
+atexit.register(_log_handler.flush)
 
 __all__ = [
     "Side",
     "cancel",
     "connect",
     "create_iceberg",
+    "create_icebergs",
     "disconnect",
     "revise",
     "status",
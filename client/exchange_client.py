@@ -1,41 +1,57 @@
+import asyncio
+import itertools
 import logging
 import uuid
-from enum import Enum
-from typing import Callable, Dict
-
-import socketio
+from collections import defaultdict
+from enum import StrEnum
+from typing import Callable, Dict, List, Optional
 
 from .globals import Side
+from .transport import Transport
 
 logger = logging.getLogger(__name__)
 
+# Outbound requests are coalesced and sent as one "<event>_batch" message per
+# event, either once the flush delay expires or when a buffer fills up.
+BATCH_FLUSH_DELAY = 0.005
+BATCH_MAX_SIZE = 128
+
 
-class OrderStatus(Enum):
+class OrderStatus(StrEnum):
     Ack = "ack"
     PartiallyFilled = "partially_filled"
     Filled = "filled"
     Cancelled = "cancelled"
 
 
-class ExchMsgType(Enum):
+class ExchMsgType(StrEnum):
     CreateResp = "create_resp"
     ReviseResp = "revise_resp"
     CancelResp = "cancel_resp"
 
 
 class ExchangeClient:
-    def __init__(self, socketio_client: socketio.Client):
-        self._sio = socketio_client
+    def __init__(self, transport: Transport):
+        self._transport = transport
         self._response_handler = lambda: logging.warning(
             "Exchange Response Handler is not set"
         )
         self.client_id = uuid.uuid4().hex
+        self._seq = itertools.count(1)
+        self._pending: Dict[str, List[Dict]] = defaultdict(list)
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # Exchange response event -> callback, looked up by a single catch-all
+        self._dispatch: Dict[str, Callable] = {}
+
+    async def connect(self, url: Optional[str] = None) -> None:
+        await self._transport.connect(
+            url or self._transport.default_url, self.client_id
+        )
 
-    def connect(self, url: str = "http://127.0.0.1:5000") -> None:
-        self._sio.connect(url)
-
-    def disconnect(self) -> None:
-        self._sio.disconnect()
+    async def disconnect(self) -> None:
+        await self.force_flush()
+        await self._transport.disconnect()
 
     def register_callbacks(
         self,
@@ -44,70 +60,119 @@ class ExchangeClient:
         revise_callback: Callable,
         cancel_callback: Callable,
     ):
-        self._create_handler = create_callback
-        self._fill_handler = fill_callback
-        self._revise_handler = revise_callback
-        self._cancel_handler = cancel_callback
+        self._dispatch = {
+            "create_resp": create_callback,
+            "fill_resp": fill_callback,
+            "revise_resp": revise_callback,
+            "cancel_resp": cancel_callback,
+        }
         self._setup_handlers()
 
-    def send_create_order_request(
+    async def send_create_order_request(
         self,
         quantity: int,
         limit_price: float,
         side: Side,
     ) -> str:
         create_request = {
-            "client_msg_id": uuid.uuid4().hex,
+            "client_msg_id": self._next_msg_id(),
             "client_id": self.client_id,
             "quantity": quantity,
             "limit_price": limit_price,
             "side": side.value,
         }
-        logger.info("Sending create order request: %s", create_request)
-        self._sio.emit("create", create_request)
+        logger.info("Queueing create order request: %s", create_request)
+        self._queue("create", create_request)
         return create_request["client_msg_id"]
 
-    def send_revise_order_request(
+    async def send_revise_order_request(
         self,
         order_id: str,
         revised_qty: int,
         revised_price: float,
     ) -> str:
         revise_request = {
-            "client_msg_id": uuid.uuid4().hex,
+            "client_msg_id": self._next_msg_id(),
             "client_id": self.client_id,
             "order_id": order_id,
             "revised_quantity": revised_qty,
             "revised_price": revised_price,
         }
-        logger.info("Sending revise order request: %s", revise_request)
-        self._sio.emit("revise", revise_request)
+        logger.info("Queueing revise order request: %s", revise_request)
+        self._queue("revise", revise_request)
         return revise_request["client_msg_id"]
 
-    def send_cancel_order_request(
+    async def send_cancel_order_request(
         self,
         order_id: str,
     ) -> str:
         cancel_request = {
-            "client_msg_id": uuid.uuid4().hex,
+            "client_msg_id": self._next_msg_id(),
             "client_id": self.client_id,
             "order_id": order_id,
         }
-        logger.info("Sending cancel order request: %s", cancel_request)
-        self._sio.emit("cancel", cancel_request)
+        logger.info("Queueing cancel order request: %s", cancel_request)
+        self._queue("cancel", cancel_request)
         return cancel_request["client_msg_id"]
 
+    def _next_msg_id(self) -> str:
+        return f"{self.client_id}{next(self._seq):016x}"
+
+    async def force_flush(self) -> None:
+        """Send all buffered requests right away."""
+        await asyncio.wait([self._start_flush()])
+
+    def _queue(self, event: str, request: Dict) -> None:
+        # Queueing never suspends the caller, the requests are sent by a task
+        pending = self._pending[event]
+        pending.append(request)
+        if len(pending) >= BATCH_MAX_SIZE:
+            self._start_flush()
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                BATCH_FLUSH_DELAY, self._start_flush
+            )
+
+    def _start_flush(self) -> asyncio.Task:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, defaultdict(list)
+        # The loop only keeps a weak reference to the task. Each flush waits for
+        # the one before it so that the batches go out in order.
+        self._flush_task = asyncio.ensure_future(self._flush(pending, self._flush_task))
+        self._flush_task.add_done_callback(self._on_flush_done)
+        return self._flush_task
+
+    def _on_flush_done(self, task: asyncio.Task) -> None:
+        if self._flush_task is task:
+            self._flush_task = None
+        if not task.cancelled() and task.exception():
+            logger.error(
+                "Failed to send the buffered requests", exc_info=task.exception()
+            )
+
+    async def _flush(
+        self, pending: Dict[str, List[Dict]], previous: Optional[asyncio.Task]
+    ) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        for event, requests in pending.items():
+            logger.info("Sending %s %s requests", len(requests), event)
+            await self._transport.emit(f"{event}_batch", requests)
+
     def _setup_handlers(self):
-        @self._sio.event
-        def connect():
+        async def on_connect():
             logger.info("Connection established")
 
-        @self._sio.event
-        def disconnect():
+        async def on_disconnect():
             logger.error("Disconnected from the exchange")
 
-        @self._sio.event
-        def connect_error(data):
+        async def on_connect_error(data):
             logger.error("The connection to the exchange failed: %s", data)
 
         def pre_handle_response(event: str, data: Dict) -> bool:
@@ -119,30 +184,29 @@ class ExchangeClient:
                 )
                 return False
             level = logging.INFO if data["status"] else logging.ERROR
-            logger.log(level, f"Received {event} with {data}")
+            if logger.isEnabledFor(level):
+                logger.log(level, "Received %s with %s", event, data)
             return True
 
-        @self._sio.on("create_resp")
-        def on_created(data: Dict):
-            if pre_handle_response("create", data):
-                self._create_handler(data)
-
-        @self._sio.on("fill_resp")
-        def on_filled(data: Dict):
-            if pre_handle_response("fill", data):
-                self._fill_handler(data)
-
-        @self._sio.on("revise_resp")
-        def on_revised(data: Dict):
-            if pre_handle_response("revise", data):
-                self._revise_handler(data)
-
-        @self._sio.on("cancel_resp")
-        def on_cancelled(data: Dict):
-            if pre_handle_response("cancel", data):
-                self._cancel_handler(data)
-
-        @self._sio.on("*")
-        def catch_all(event, data: Dict):
-            if pre_handle_response(event, data):
-                logger.warning(f"Unknown event {event} with response: {data}")
+        async def handle_response(event: str, data: Dict):
+            if not pre_handle_response(event, data):
+                return
+            handler = self._dispatch.get(event)
+            if handler:
+                await handler(data)
+            else:
+                logger.warning("Unknown event %s with response: %s", event, data)
+
+        async def on_event(event: str, data):
+            # "<event>_batch" carries a list of responses to the same event
+            event, batch, _ = event.partition("_batch")
+            if not batch:
+                await handle_response(event, data)
+                return
+            for response in data:
+                await handle_response(event, response)
+
+        self._transport.on("connect", on_connect)
+        self._transport.on("disconnect", on_disconnect)
+        self._transport.on("connect_error", on_connect_error)
+        self._transport.on("*", on_event)
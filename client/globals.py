@@ -1,26 +1,25 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 from message.message import Side
 
 
-class State(Enum):
-    Rejected = "Rejected"
-    Pending = "Pending"
-    Working = "Working"
-    Sent = "Sent"
-    ReviseSent = "ReviseSent"
-    CancelSent = "CancelSent"
-    Cancelled = "Cancelled"
-    PartiallyFilled = "PartiallyFilled"
-    Filled = "Filled"
-    Suspended = "Suspended"
+class State(IntEnum):
+    Rejected = 0
+    Pending = 1
+    Working = 2
+    Sent = 3
+    ReviseSent = 4
+    CancelSent = 5
+    Cancelled = 6
+    PartiallyFilled = 7
+    Filled = 8
+    Suspended = 9
 
+    # Log the state by its name rather than its number
+    __str__ = Enum.__str__
 
-ORDER_SIDES = [side for side in Side]
-ACTIVE_STATES = [
-    State.Pending,
-    State.Working,
-    State.PartiallyFilled,
-]
-TRANSIENT_STATES = [State.Sent, State.ReviseSent, State.CancelSent]
-COMPLETED_STATES = [State.Rejected, State.Cancelled, State.Filled]
+
+ORDER_SIDES = frozenset(Side)
+ACTIVE_STATES = frozenset({State.Pending, State.Working, State.PartiallyFilled})
+TRANSIENT_STATES = frozenset({State.Sent, State.ReviseSent, State.CancelSent})
+COMPLETED_STATES = frozenset({State.Rejected, State.Cancelled, State.Filled})
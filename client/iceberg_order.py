@@ -5,6 +5,20 @@ from .globals import State
 
 
 class IcebergOrder:
+    __slots__ = (
+        "client",
+        "total_quantity",
+        "side",
+        "limit_price",
+        "filled_quantity",
+        "slice_size",
+        "slice_filled_quantity",
+        "slice_message_id",
+        "slice_order_id",
+        "state",
+        "parent_state",
+    )
+
     def __init__(
         self,
         client: ExchangeClient,
@@ -38,10 +52,11 @@ class IcebergOrder:
             }
         )
 
-    def submit(self) -> None:
+    async def submit(self) -> None:
         """Create a slice for the order and send it to the exchange.
         Interact with the exchange simulator through self.client and keep track of the order
-        by its message ID.
+        by its message ID. Requests sent through self.client are coroutines and must be
+        awaited.
         """
         pass
 
@@ -49,11 +64,11 @@ class IcebergOrder:
         """Callback of a slice that has been created."""
         pass
 
-    def slice_fill(self, filled_quantity: int, status: bool) -> int:
+    async def slice_fill(self, filled_quantity: int, status: bool) -> int:
         """Callback for a slice getting filled partially or fully."""
         pass
 
-    def revise(self, revised_quantity: int, revised_price: float) -> None:
+    async def revise(self, revised_quantity: int, revised_price: float) -> None:
         """Revise a parent order by updating its iceberg slice.
         The slice should be updated accordingly to what we need for the parent, may need to do
         nothing, cancel the last slice or revise the last slice.
@@ -61,13 +76,13 @@ class IcebergOrder:
         """
         pass
 
-    def revised(
+    async def revised(
         self, revised_quantity: int, revised_price: float, status: bool
     ) -> None:
         """Callback of a slice that has been revised."""
         pass
 
-    def cancel(self) -> None:
+    async def cancel(self) -> None:
         """Cancel a slice if possible.
         Note: Not all states of a slice can be updated. ACTIVE_STATES are good to update.
         """
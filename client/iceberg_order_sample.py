@@ -8,8 +8,31 @@ from .globals import ACTIVE_STATES, State
 
 logger = logging.getLogger(__name__)
 
+# (fully filled, nothing filled) -> state of a slice or of the parent order
+_SLICE_STATES = {
+    (True, True): State.Filled,
+    (True, False): State.Filled,
+    (False, True): State.Working,
+    (False, False): State.PartiallyFilled,
+}
+
 
 class IcebergOrder:
+    __slots__ = (
+        "client",
+        "total_quantity",
+        "side",
+        "limit_price",
+        "filled_quantity",
+        "slice_size",
+        "slice_filled_quantity",
+        "slice_message_id",
+        "slice_order_id",
+        "last_slice_state",
+        "parent_state",
+        "_send_create",
+    )
+
     def __init__(
         self,
         client: ExchangeClient,
@@ -29,6 +52,7 @@ class IcebergOrder:
         self.slice_order_id = None
         self.last_slice_state = State.Pending
         self.parent_state = State.Pending
+        self._send_create = client.send_create_order_request
 
     def __repr__(self) -> str:
         return str(
@@ -43,37 +67,40 @@ class IcebergOrder:
             }
         )
 
-    def submit(self) -> None:
+    async def submit(self) -> None:
         self.slice_filled_quantity = 0
         self.slice_order_id = None
-        self.slice_message_id = self.client.send_create_order_request(
+        self.slice_message_id = await self._send_create(
             self.slice_size, self.limit_price, self.side
         )
         self.last_slice_state = State.Sent
         if self.parent_state != State.PartiallyFilled:
             self.parent_state = State.Sent
 
-    def evaluate_and_slice(self):
-        if self.slice_filled_quantity == self.slice_size:
-            self.last_slice_state = State.Filled
-        elif self.slice_filled_quantity > 0:
-            self.last_slice_state = State.PartiallyFilled
-        else:
-            self.last_slice_state = State.Working
-
-        if self.filled_quantity == self.total_quantity:
-            self.parent_state = State.Filled
-        elif self.filled_quantity > 0:
-            self.parent_state = State.PartiallyFilled
-        else:
-            self.parent_state = State.Working
+    async def evaluate_and_slice(self):
+        self.last_slice_state = _SLICE_STATES[
+            self.slice_filled_quantity == self.slice_size,
+            self.slice_filled_quantity == 0,
+        ]
+        self.parent_state = _SLICE_STATES[
+            self.filled_quantity == self.total_quantity, self.filled_quantity == 0
+        ]
 
         if (
             self.last_slice_state == State.Filled
             and self.filled_quantity < self.total_quantity
         ):
             # Filled slice, slice some more
-            self.submit()
+            await self._resubmit_next_slice()
+
+    async def _resubmit_next_slice(self) -> None:
+        # The parent is partially filled at this point, so only the slice changes
+        self.slice_filled_quantity = 0
+        self.slice_order_id = None
+        self.slice_message_id = await self._send_create(
+            self.slice_size, self.limit_price, self.side
+        )
+        self.last_slice_state = State.Sent
 
     def slice_created(self, order_id: str, status: bool) -> None:
         if not status:
@@ -85,23 +112,24 @@ class IcebergOrder:
         self.last_slice_state = State.Working
         self.parent_state = State.Working
 
-    def slice_fill(self, filled_quantity: int, status: bool) -> int:
+    async def slice_fill(self, filled_quantity: int, status: bool) -> int:
         if not status:
             logger.warning("Received Unsuccesful fill %s ", self.slice_order_id)
             return 0
         new_filled_quantity = filled_quantity - self.slice_filled_quantity
         self.slice_filled_quantity = filled_quantity
         self.filled_quantity += new_filled_quantity
-        self.evaluate_and_slice()
+        await self.evaluate_and_slice()
 
         return new_filled_quantity
 
-    def revise(self, revised_quantity: int, revised_price: float) -> None:
-        logger.info(
-            "Received revise request, revised_quantity: %s and revised_price: %s",
-            revised_quantity,
-            revised_price,
-        )
+    async def revise(self, revised_quantity: int, revised_price: float) -> None:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Received revise request, revised_quantity: %s and revised_price: %s",
+                revised_quantity,
+                revised_price,
+            )
         if self.parent_state not in ACTIVE_STATES or not self.slice_order_id:
             logger.error(
                 "Order is of %s state and can not be revised",
@@ -123,7 +151,7 @@ class IcebergOrder:
             logger.info(
                 "Cancelling outstanding slice as the revised quantity is already filled"
             )
-            self.client.send_cancel_order_request(self.slice_order_id)
+            await self.client.send_cancel_order_request(self.slice_order_id)
             self.last_slice_state = State.CancelSent
             self.parent_state = State.CancelSent
             return
@@ -131,7 +159,7 @@ class IcebergOrder:
             logger.info(
                 "Revising down outstanding slice size to %s", slice_open_quantity
             )
-            self.client.send_revise_order_request(
+            await self.client.send_revise_order_request(
                 self.slice_order_id,
                 slice_open_quantity,
                 revised_price,
@@ -141,7 +169,7 @@ class IcebergOrder:
             return
         elif self.limit_price != revised_price:
             logger.info("Sending revise price request")
-            self.client.send_revise_order_request(
+            await self.client.send_revise_order_request(
                 self.slice_order_id, self.slice_size, revised_price
             )
             self.last_slice_state = State.ReviseSent
@@ -149,9 +177,10 @@ class IcebergOrder:
             return
         self.total_quantity = revised_quantity
         self.limit_price = revised_price
-        logger.info("Updated hidden quantity and price: %s", self)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Updated hidden quantity and price: %s", self)
 
-    def revised(
+    async def revised(
         self, revised_quantity: int, revised_price: float, status: boolean
     ) -> None:
         if self.last_slice_state != State.ReviseSent:
@@ -166,14 +195,14 @@ class IcebergOrder:
         self.slice_size = revised_quantity
         self.limit_price = revised_price
 
-        self.evaluate_and_slice()
+        await self.evaluate_and_slice()
 
-    def cancel(self) -> None:
+    async def cancel(self) -> None:
         if self.last_slice_state not in ACTIVE_STATES or not self.slice_order_id:
             logger.warning("Your order is in Transient State and cannot be modified")
             return
 
-        self.client.send_cancel_order_request(self.slice_order_id)
+        await self.client.send_cancel_order_request(self.slice_order_id)
         self.last_slice_state = State.CancelSent
         self.parent_state = State.CancelSent
 
@@ -1,9 +1,11 @@
 import logging
-import threading
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from pprint import pprint
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
+
+from sortedcontainers import SortedList
 
 from .exchange_client import ExchangeClient
 from .globals import COMPLETED_STATES, Side, State
@@ -12,10 +14,40 @@ from .iceberg_order import IcebergOrder
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class ParentOrder:
+    parent_id: str
+    side: Side
+    quantity: int
+    filled_quantity: int
+    limit_price: float
+    state: State
+    updated_at: datetime
+    iceberg_order: IcebergOrder
+
+
 class StrategyManager:
+    """Keeps track of the parent iceberg orders.
+
+    All methods are expected to run on the event loop of the exchange client, which
+    is also where the exchange responses are handled. The transport may handle
+    every response in a task of its own, but the only awaits in the handlers are
+    the requests of the exchange client, which are queued without suspending the
+    caller. A handler therefore runs to completion before the next one starts, and
+    no lock is needed around the orders. Iceberg orders must keep it that way and
+    not await anything else while they handle a response.
+    """
+
     def __init__(self, client: ExchangeClient):
-        self.orders = {}
-        self.lock = threading.Lock()
+        self.orders: Dict[str, ParentOrder] = {}
+        # Slice message ID / exchange order ID -> parent ID of the live slices and
+        # of the last slice of every completed parent, whose late responses are
+        # recognised and ignored
+        self._by_msg_id: Dict[str, str] = {}
+        self._by_order_id: Dict[str, str] = {}
+        # Parent orders split by completion, ordered by their last update
+        self._completed = SortedList(key=lambda order: order.updated_at)
+        self._pending = SortedList(key=lambda order: order.updated_at)
         client.register_callbacks(
             self.on_create_resp,
             self.on_fill_resp,
@@ -27,12 +59,11 @@ class StrategyManager:
     def get_iceberg_order_parent(
         self, order_id: str, message_id: Optional[str] = None
     ) -> Optional[str]:
-        for parent_id, order in self.orders.items():
-            manager = order["iceberg_order"]
-            if manager.slice_order_id == order_id or (
-                message_id and manager.slice_message_id == message_id
-            ):
-                return parent_id
+        parent_id = self._by_order_id.get(order_id) or (
+            self._by_msg_id.get(message_id) if message_id else None
+        )
+        if parent_id:
+            return parent_id
         logger.error(
             "Could not find parent for order ID %s and message ID %s",
             order_id,
@@ -40,25 +71,55 @@ class StrategyManager:
         )
         return None
 
-    def create_iceberg(
+    def _update_slice_index(
+        self, parent_id: str, old_message_id: Optional[str], old_order_id: Optional[str]
+    ) -> None:
+        self._by_msg_id.pop(old_message_id, None)
+        self._by_order_id.pop(old_order_id, None)
+        iceberg_order = self.orders[parent_id].iceberg_order
+        if iceberg_order.slice_message_id:
+            self._by_msg_id[iceberg_order.slice_message_id] = parent_id
+        if iceberg_order.slice_order_id:
+            self._by_order_id[iceberg_order.slice_order_id] = parent_id
+
+    def _update_parent(self, parent: ParentOrder, state: State) -> None:
+        # Take the parent out before its sort key changes
+        self._pending.discard(parent)
+        self._completed.discard(parent)
+        parent.updated_at = datetime.now()
+        parent.state = state
+        if state in COMPLETED_STATES:
+            self._completed.add(parent)
+        else:
+            self._pending.add(parent)
+
+    async def create_iceberg(
         self, side: Side, quantity: int, limit_price: float, slice_size: int
     ) -> None:
         parent_id = uuid.uuid4().hex
-        self.orders[parent_id] = {
-            "parent_id": parent_id,
-            "side": side,
-            "quantity": quantity,
-            "filled_quantity": 0,
-            "limit_price": limit_price,
-            "state": State.Sent,
-            "updated_at": datetime.now(),
-            "iceberg_order": IcebergOrder(
+        self.orders[parent_id] = ParentOrder(
+            parent_id=parent_id,
+            side=side,
+            quantity=quantity,
+            filled_quantity=0,
+            limit_price=limit_price,
+            state=State.Sent,
+            updated_at=datetime.now(),
+            iceberg_order=IcebergOrder(
                 self.client, quantity, slice_size, side, limit_price
             ),
-        }
-        self.orders[parent_id]["iceberg_order"].submit()
+        )
+        self._pending.add(self.orders[parent_id])
+        await self.orders[parent_id].iceberg_order.submit()
+        self._update_slice_index(parent_id, None, None)
 
-    def on_create_resp(self, data: Dict) -> None:
+    async def create_many(self, orders: Iterable[Tuple[Side, int, float, int]]) -> None:
+        # The first slices of all the parents reach the exchange as one batch
+        for side, quantity, limit_price, slice_size in orders:
+            await self.create_iceberg(side, quantity, limit_price, slice_size)
+        await self.client.force_flush()
+
+    async def on_create_resp(self, data: Dict) -> None:
 
         order_id = data["order_params"]["exch_order_id"]
         parent_id = self.get_iceberg_order_parent(order_id, data["client_msg_id"])
@@ -66,133 +127,120 @@ class StrategyManager:
             return
 
         if data["name"] == "FillOrderResponse":
-            self.on_fill_resp(data)
+            await self.on_fill_resp(data)
         elif data["name"] == "OrderResponse":
-            self.orders[parent_id]["iceberg_order"].slice_created(
+            parent = self.orders[parent_id]
+            iceberg_order = parent.iceberg_order
+            old_keys = iceberg_order.slice_message_id, iceberg_order.slice_order_id
+            iceberg_order.slice_created(
                 order_id,
                 data["status"],
             )
 
-            with self.lock:
-                parent = self.orders[parent_id]
-                parent["updated_at"] = datetime.now()
-                parent["state"] = parent["iceberg_order"].parent_state
-                self.orders[parent_id] = parent
+            self._update_parent(parent, iceberg_order.parent_state)
+            self._update_slice_index(parent_id, *old_keys)
         else:
             logger.warning("Received unexpected message %s", data)
 
-    def on_fill_resp(self, data: Dict) -> None:
-        logger.info("on_fill_resp: %s", data)
-        order_id = data["order_params"]["exch_order_id"]
-        parent_id = self.get_iceberg_order_parent(order_id)
+    async def on_fill_resp(self, data: Dict) -> None:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("on_fill_resp: %s", data)
+        params = data["order_params"]
+        parent_id = self.get_iceberg_order_parent(params["exch_order_id"])
         if not parent_id:
             return
-        filled_quantity = self.orders[parent_id]["iceberg_order"].slice_fill(
-            data["order_params"]["filled_quantity"],
-            data["status"],
+        parent = self.orders[parent_id]
+        if parent.state in COMPLETED_STATES:
+            logger.debug("Ignoring %s for completed parent %s", data, parent_id)
+            return
+        iceberg_order = parent.iceberg_order
+        old_keys = iceberg_order.slice_message_id, iceberg_order.slice_order_id
+        filled_quantity = await iceberg_order.slice_fill(
+            params["filled_quantity"], data["status"]
         )
 
-        with self.lock:
-            parent = self.orders[parent_id]
-            parent["filled_quantity"] += filled_quantity
-            parent["updated_at"] = datetime.now()
-            parent["state"] = parent["iceberg_order"].parent_state
-            self.orders[parent_id] = parent
+        parent.filled_quantity += filled_quantity
+        self._update_parent(parent, iceberg_order.parent_state)
+        self._update_slice_index(parent_id, *old_keys)
 
-    def revise(
+    async def revise(
         self, order_id: str, revised_quantity: int, revised_limit_price: float
     ) -> None:
-        with self.lock:
-            order = self.orders.get(order_id)
-            if not order:
-                logger.error("Could not find order with ID %s to revise it.", order_id)
-                return
-
-            order["iceberg_order"].revise(revised_quantity, revised_limit_price)
-            order["quantity"] = revised_quantity
-            order["limit_price"] = revised_limit_price
-            order["state"] = order["iceberg_order"].parent_state
-            order["updated_at"] = datetime.now()
-
-            self.orders[order_id] = order
-
-    def on_revise_resp(self, data: Dict) -> None:
-        logger.info("on_revise_resp: %s", data)
+        order = self.orders.get(order_id)
+        if not order:
+            logger.error("Could not find order with ID %s to revise it.", order_id)
+            return
+
+        await order.iceberg_order.revise(revised_quantity, revised_limit_price)
+        order.quantity = revised_quantity
+        order.limit_price = revised_limit_price
+        self._update_parent(order, order.iceberg_order.parent_state)
+
+    async def on_revise_resp(self, data: Dict) -> None:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("on_revise_resp: %s", data)
         message_name = data["name"]
         if message_name == "FillOrderResponse":
-            self.on_fill_resp(data)
+            await self.on_fill_resp(data)
             return
 
         if message_name != "OrderResponse":
             logger.error("Received unexpected message %s", data)
             return
 
-        with self.lock:
-            if not data["status"]:
-                logger.warning("Received an error on revise response %s", data)
-                return
-
-            order_id = data["order_params"]["exch_order_id"]
-            parent_id = self.get_iceberg_order_parent(order_id, data["client_msg_id"])
-            if not parent_id:
-                return
+        status = data["status"]
+        if not status:
+            logger.warning("Received an error on revise response %s", data)
+            return
 
-            parent = self.orders[parent_id]
-            parent["iceberg_order"].revised(
-                data["order_params"]["quantity"],
-                data["order_params"]["limit_price"],
-                data["status"],
-            )
-            parent["updated_at"] = datetime.now()
-            parent["state"] = parent["iceberg_order"].parent_state
-            self.orders[parent_id] = parent
+        params = data["order_params"]
+        parent_id = self.get_iceberg_order_parent(
+            params["exch_order_id"], data["client_msg_id"]
+        )
+        if not parent_id:
+            return
 
-    def cancel(self, order_id: str) -> None:
+        parent = self.orders[parent_id]
+        if parent.state in COMPLETED_STATES:
+            logger.debug("Ignoring %s for completed parent %s", data, parent_id)
+            return
+        iceberg_order = parent.iceberg_order
+        old_keys = iceberg_order.slice_message_id, iceberg_order.slice_order_id
+        await iceberg_order.revised(params["quantity"], params["limit_price"], status)
+        # The slice may have moved on already, in which case nothing changed
+        if iceberg_order.parent_state != parent.state:
+            self._update_parent(parent, iceberg_order.parent_state)
+        self._update_slice_index(parent_id, *old_keys)
+
+    async def cancel(self, order_id: str) -> None:
         parent = self.orders.get(order_id)
         if not parent:
             logger.error("Could not find parent for order ID %s.", order_id)
             return
-        with self.lock:
-            parent["iceberg_order"].cancel()
-            parent["updated_at"] = datetime.now()
-            parent["state"] = parent["iceberg_order"].parent_state
-            self.orders[order_id] = parent
+        await parent.iceberg_order.cancel()
+        self._update_parent(parent, parent.iceberg_order.parent_state)
 
-    def on_cancel_resp(self, data: Dict) -> None:
+    async def on_cancel_resp(self, data: Dict) -> None:
         order_id = data["order_params"]["exch_order_id"]
         parent_id = self.get_iceberg_order_parent(order_id, data["client_msg_id"])
         if not parent_id:
             return
 
-        with self.lock:
-            parent = self.orders[parent_id]
-            parent["iceberg_order"].cancelled(data["status"])
-            parent["updated_at"] = datetime.now()
-            parent["state"] = parent["iceberg_order"].parent_state
-            self.orders[parent_id] = parent
+        parent = self.orders[parent_id]
+        if parent.state in COMPLETED_STATES:
+            logger.debug("Ignoring %s for completed parent %s", data, parent_id)
+            return
+        iceberg_order = parent.iceberg_order
+        old_keys = iceberg_order.slice_message_id, iceberg_order.slice_order_id
+        iceberg_order.cancelled(data["status"])
+        if iceberg_order.parent_state != parent.state:
+            self._update_parent(parent, iceberg_order.parent_state)
+        self._update_slice_index(parent_id, *old_keys)
 
     def print_status(self, order_id=None) -> None:
         if order_id:
             print(self.orders.get(order_id, f"Order ID {order_id} not found"))
-        filled = sorted(
-            [
-                value
-                for value in self.orders.values()
-                if value["state"] in COMPLETED_STATES
-            ],
-            key=lambda x: x["updated_at"],
-            reverse=True,
-        )
-        pending = sorted(
-            [
-                value
-                for value in self.orders.values()
-                if value["state"] not in COMPLETED_STATES
-            ],
-            key=lambda x: x["updated_at"],
-            reverse=True,
-        )
         print("Completed orders:")
-        pprint(filled)
+        pprint(list(reversed(self._completed)))
         print("Pending orders:")
-        pprint(pending)
+        pprint(list(reversed(self._pending)))
@@ -0,0 +1,184 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from client.exchange_client import (BATCH_FLUSH_DELAY, BATCH_MAX_SIZE,
+                                    ExchangeClient)
+from client.transport import Transport
+from message.message import Side
+
+DEFAULT_PRICE = 100.00
+DEFAULT_QTY = 10
+DEFAULT_SIDE = Side.Buy
+
+
+@pytest.fixture
+def transport():
+    return mock.Mock(spec=Transport)
+
+
+@pytest.fixture
+def exchange_client(transport):
+    return ExchangeClient(transport)
+
+
+def test_connect_defaults_to_the_transport_url(exchange_client, transport):
+    # Given
+    transport.default_url = "tcp://127.0.0.1:5555"
+
+    # When
+    asyncio.run(exchange_client.connect())
+    asyncio.run(exchange_client.connect("tcp://other:5555"))
+
+    # Then
+    assert [call.args for call in transport.connect.await_args_list] == [
+        ("tcp://127.0.0.1:5555", exchange_client.client_id),
+        ("tcp://other:5555", exchange_client.client_id),
+    ]
+
+
+def test_requests_are_batched_per_event(exchange_client, transport):
+    # Given
+    async def send_requests():
+        create_msg_ids = [
+            await exchange_client.send_create_order_request(
+                DEFAULT_QTY, DEFAULT_PRICE, DEFAULT_SIDE
+            )
+            for _ in range(3)
+        ]
+        cancel_msg_id = await exchange_client.send_cancel_order_request("1234")
+        transport.emit.assert_not_called()
+        await asyncio.sleep(BATCH_FLUSH_DELAY * 4)
+        return create_msg_ids, cancel_msg_id
+
+    # When
+    create_msg_ids, cancel_msg_id = asyncio.run(send_requests())
+
+    # Then
+    assert transport.emit.await_count == 2
+    (create_event, create_requests), (cancel_event, cancel_requests) = [
+        call.args for call in transport.emit.await_args_list
+    ]
+    assert create_event == "create_batch"
+    assert [r["client_msg_id"] for r in create_requests] == create_msg_ids
+    assert cancel_event == "cancel_batch"
+    assert [r["client_msg_id"] for r in cancel_requests] == [cancel_msg_id]
+
+
+def test_full_buffer_is_flushed_immediately(exchange_client, transport):
+    # When
+    async def send_requests():
+        for _ in range(BATCH_MAX_SIZE):
+            await exchange_client.send_create_order_request(
+                DEFAULT_QTY, DEFAULT_PRICE, DEFAULT_SIDE
+            )
+        await asyncio.sleep(0)
+
+    asyncio.run(send_requests())
+
+    # Then
+    transport.emit.assert_awaited_once()
+    event, requests = transport.emit.await_args.args
+    assert event == "create_batch"
+    assert len(requests) == BATCH_MAX_SIZE
+
+
+def test_batches_are_sent_in_order(exchange_client, transport):
+    # Given
+    sent = []
+
+    async def emit(event, requests):
+        # The first batch takes longer than the flush delay to go out
+        if transport.emit.await_count == 1:
+            await asyncio.sleep(BATCH_FLUSH_DELAY * 2)
+        sent.append(event)
+
+    transport.emit.side_effect = emit
+
+    # When
+    async def send_requests():
+        for _ in range(BATCH_MAX_SIZE):
+            await exchange_client.send_create_order_request(
+                DEFAULT_QTY, DEFAULT_PRICE, DEFAULT_SIDE
+            )
+        await exchange_client.send_cancel_order_request("1234")
+        await asyncio.sleep(BATCH_FLUSH_DELAY * 6)
+
+    asyncio.run(send_requests())
+
+    # Then
+    assert sent == ["create_batch", "cancel_batch"]
+
+
+def test_disconnect_flushes_pending_requests(exchange_client, transport):
+    # When
+    async def send_and_disconnect():
+        await exchange_client.send_revise_order_request("1234", 5, DEFAULT_PRICE)
+        await exchange_client.disconnect()
+
+    asyncio.run(send_and_disconnect())
+
+    # Then
+    transport.emit.assert_awaited_once()
+    assert transport.emit.await_args.args[0] == "revise_batch"
+    transport.disconnect.assert_awaited_once()
+
+
+def test_failed_timer_flush_is_logged(exchange_client, transport, caplog):
+    # Given
+    transport.emit.side_effect = ConnectionError("Not connected")
+
+    # When
+    async def send_requests():
+        await exchange_client.send_cancel_order_request("1234")
+        await asyncio.sleep(BATCH_FLUSH_DELAY * 4)
+
+    asyncio.run(send_requests())
+
+    # Then
+    transport.emit.assert_awaited_once()
+    assert "Failed to send the buffered requests" in caplog.text
+    assert "Not connected" in caplog.text
+
+
+def test_responses_are_dispatched_by_event(exchange_client, transport):
+    # Given
+    callbacks = [mock.AsyncMock() for _ in range(4)]
+    exchange_client.register_callbacks(*callbacks)
+    on_event = next(
+        call.args[1] for call in transport.on.call_args_list if call.args[0] == "*"
+    )
+    response = {"client_id": exchange_client.client_id, "status": True}
+
+    # When
+    asyncio.run(on_event("fill_resp", response))
+    asyncio.run(on_event("unknown_resp", response))
+    asyncio.run(on_event("create_resp", {**response, "client_id": "other"}))
+
+    # Then
+    create_callback, fill_callback, revise_callback, cancel_callback = callbacks
+    fill_callback.assert_awaited_once_with(response)
+    create_callback.assert_not_awaited()
+    revise_callback.assert_not_awaited()
+    cancel_callback.assert_not_awaited()
+
+
+def test_batched_responses_are_fanned_out(exchange_client, transport):
+    # Given
+    callbacks = [mock.AsyncMock() for _ in range(4)]
+    exchange_client.register_callbacks(*callbacks)
+    on_event = next(
+        call.args[1] for call in transport.on.call_args_list if call.args[0] == "*"
+    )
+    responses = [
+        {"client_id": exchange_client.client_id, "status": True, "n": n}
+        for n in range(3)
+    ]
+
+    # When
+    asyncio.run(on_event("fill_resp_batch", responses))
+
+    # Then
+    fill_callback = callbacks[1]
+    assert [call.args[0] for call in fill_callback.await_args_list] == responses
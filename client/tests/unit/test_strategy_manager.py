@@ -1,9 +1,12 @@
+import asyncio
 import logging
 from unittest import mock
 
 import pytest
 
+from client.exchange_client import ExchangeClient
 from client.globals import State
+from client.iceberg_order_sample import IcebergOrder as SampleIcebergOrder
 from client.strategy_manager import StrategyManager
 from message.message import Side
 
@@ -23,16 +26,24 @@ DEFAULT_ORDER_ID = "1234"
 
 @pytest.fixture
 def strategy_manager():
-    return StrategyManager(mock.Mock())
+    return StrategyManager(mock.Mock(spec=ExchangeClient))
+
+
+@pytest.fixture
+def sample_iceberg_order(monkeypatch):
+    # Runs the strategy manager against the sample instead of the stub slicing
+    monkeypatch.setattr("client.strategy_manager.IcebergOrder", SampleIcebergOrder)
 
 
 @pytest.fixture
 def order_id(strategy_manager):
-    strategy_manager.create_iceberg(
-        side=DEFAULT_SIDE,
-        quantity=DEFAULT_QTY,
-        limit_price=DEFAULT_PRICE,
-        slice_size=DEFAULT_SLICE_SIZE,
+    asyncio.run(
+        strategy_manager.create_iceberg(
+            side=DEFAULT_SIDE,
+            quantity=DEFAULT_QTY,
+            limit_price=DEFAULT_PRICE,
+            slice_size=DEFAULT_SLICE_SIZE,
+        )
     )
 
     return next(iter(strategy_manager.orders.keys()))
@@ -40,27 +51,28 @@ def order_id(strategy_manager):
 
 @pytest.fixture
 def given_acked_order(exchange_create_response):
-    strategy_manager.on_create_resp(exchange_create_response)
+    asyncio.run(strategy_manager.on_create_resp(exchange_create_response))
 
 
 @pytest.fixture
 def fill_order_id(strategy_manager, order_id):
-    slice = strategy_manager.orders[order_id]["iceberg_order"]
-    strategy_manager.orders[order_id]["state"] = State.Filled
-    strategy_manager.orders[order_id]["filled_quantity"] = 10
+    # Sets the slice attributes of the sample iceberg order
+    slice = strategy_manager.orders[order_id].iceberg_order
+    strategy_manager.orders[order_id].state = State.Filled
+    strategy_manager.orders[order_id].filled_quantity = 10
     slice.last_slice_state = State.Filled
-    slice.parent_slice_state = State.Filled
+    slice.parent_state = State.Filled
     slice.slice_order_id = DEFAULT_ORDER_ID
     slice.slice_filled_quantity = 10
     slice.filled_quantity = 10
-    strategy_manager.orders[order_id]["iceberg_order"] = slice
+    strategy_manager.orders[order_id].iceberg_order = slice
 
     return next(iter(strategy_manager.orders.keys()))
 
 
 @pytest.fixture
 def exchange_create_response(strategy_manager, order_id):
-    slice = strategy_manager.orders[order_id]["iceberg_order"]
+    slice = strategy_manager.orders[order_id].iceberg_order
     return {
         "name": "OrderResponse",
         "client_msg_id": slice.slice_message_id,
@@ -81,7 +93,7 @@ def exchange_create_response(strategy_manager, order_id):
 
 @pytest.fixture
 def exchange_revise_response(strategy_manager, order_id):
-    slice = strategy_manager.orders[order_id]["iceberg_order"]
+    slice = strategy_manager.orders[order_id].iceberg_order
     return {
         "name": "OrderResponse",
         "client_msg_id": slice.slice_message_id,
@@ -102,7 +114,7 @@ def exchange_revise_response(strategy_manager, order_id):
 
 @pytest.fixture
 def exchange_cancel_response(strategy_manager, order_id):
-    slice = strategy_manager.orders[order_id]["iceberg_order"]
+    slice = strategy_manager.orders[order_id].iceberg_order
     return {
         "name": "OrderResponse",
         "client_msg_id": slice.slice_message_id,
@@ -149,70 +161,79 @@ def given_order_is_filled(strategy_manager, order_id):
             "status_msg": "Order filled successfully",
         }
     }
-    strategy_manager.on_fill_response(mock_response)
+    asyncio.run(strategy_manager.on_fill_response(mock_response))
     parent_order_id = next(iter(strategy_manager.orders.keys()))
     return parent_order_id
 
 
 def test_ordercreation(strategy_manager, order_id):
     # then
-    assert strategy_manager.orders[order_id]["state"] == State.Sent
-    assert strategy_manager.orders[order_id]["iceberg_order"]
-    assert strategy_manager.orders[order_id]["limit_price"] == DEFAULT_PRICE
-    assert strategy_manager.orders[order_id]["side"] == DEFAULT_SIDE
-    assert strategy_manager.orders[order_id]["quantity"] == DEFAULT_QTY
-    assert strategy_manager.orders[order_id]["filled_quantity"] == DEFAULT_FILLED_QTY
+    assert strategy_manager.orders[order_id].state == State.Sent
+    assert strategy_manager.orders[order_id].iceberg_order
+    assert strategy_manager.orders[order_id].limit_price == DEFAULT_PRICE
+    assert strategy_manager.orders[order_id].side == DEFAULT_SIDE
+    assert strategy_manager.orders[order_id].quantity == DEFAULT_QTY
+    assert strategy_manager.orders[order_id].filled_quantity == DEFAULT_FILLED_QTY
 
 
 def test_on_create_resp(exchange_create_response, order_id, strategy_manager):
     # When
-    strategy_manager.on_create_resp(exchange_create_response)
+    asyncio.run(strategy_manager.on_create_resp(exchange_create_response))
 
     # Then
     assert (
-        strategy_manager.orders[order_id]["state"]
-        == strategy_manager.orders[order_id]["iceberg_order"].last_slice_state
+        strategy_manager.orders[order_id].state
+        == strategy_manager.orders[order_id].iceberg_order.last_slice_state
     )
 
 
 def test_revise_pass(exchange_create_response, order_id, strategy_manager):
     # Given
-    strategy_manager.on_create_resp(exchange_create_response)
+    asyncio.run(strategy_manager.on_create_resp(exchange_create_response))
 
     # When
     print(strategy_manager.orders)
-    strategy_manager.revise(
-        order_id=order_id,
-        revised_quantity=DEFAULT_REVISED_QTY,
-        revised_limit_price=DEFAULT_REVISED_PRICE,
+    asyncio.run(
+        strategy_manager.revise(
+            order_id=order_id,
+            revised_quantity=DEFAULT_REVISED_QTY,
+            revised_limit_price=DEFAULT_REVISED_PRICE,
+        )
     )
 
     # Then
-    assert strategy_manager.orders[order_id]["quantity"] == DEFAULT_REVISED_QTY
-    assert strategy_manager.orders[order_id]["limit_price"] == DEFAULT_REVISED_PRICE
+    assert strategy_manager.orders[order_id].quantity == DEFAULT_REVISED_QTY
+    assert strategy_manager.orders[order_id].limit_price == DEFAULT_REVISED_PRICE
 
 
 def test_revise_fail(order_id, strategy_manager, caplog, exchange_create_response):
 
     # When
-    strategy_manager.revise(
-        order_id=order_id,
-        revised_quantity=DEFAULT_REVISED_QTY,
-        revised_limit_price=DEFAULT_PRICE,
+    asyncio.run(
+        strategy_manager.revise(
+            order_id=order_id,
+            revised_quantity=DEFAULT_REVISED_QTY,
+            revised_limit_price=DEFAULT_PRICE,
+        )
     )
 
     # Then
     assert "is of State.Sent state and can not be revised" in caplog.text
 
 
+@pytest.mark.usefixtures("sample_iceberg_order")
 def test_revise_order_qty_less_order_filled_fail(
     exchange_create_response, strategy_manager, fill_order_id, caplog
 ):
     # Given
-    strategy_manager.on_create_resp(exchange_create_response)
-
-    strategy_manager.revise(
-        order_id=fill_order_id, revised_quantity=5, revised_limit_price=DEFAULT_PRICE
+    asyncio.run(strategy_manager.on_create_resp(exchange_create_response))
+
+    asyncio.run(
+        strategy_manager.revise(
+            order_id=fill_order_id,
+            revised_quantity=5,
+            revised_limit_price=DEFAULT_PRICE,
+        )
     )
     # Then
     assert "Can not update quantity to 5, already filled 10" in caplog.text
@@ -221,14 +242,112 @@ def test_revise_order_qty_less_order_filled_fail(
 def test_cancel(
     order_id, strategy_manager, exchange_create_response, exchange_cancel_response
 ):
-    strategy_manager.on_create_resp(exchange_create_response)
+    asyncio.run(strategy_manager.on_create_resp(exchange_create_response))
+
+    # When
+    asyncio.run(strategy_manager.cancel(order_id))
+
+    # Then
+    assert strategy_manager.orders[order_id].state == State.CancelSent
+
+    asyncio.run(strategy_manager.on_cancel_resp(exchange_cancel_response))
+
+    assert strategy_manager.orders[order_id].state == State.Cancelled
+
+
+@pytest.mark.usefixtures("sample_iceberg_order")
+def test_parent_lookup_follows_slice_lifecycle(
+    order_id, strategy_manager, exchange_create_response, exchange_cancel_response
+):
+    # Given
+    slice = strategy_manager.orders[order_id].iceberg_order
+    assert strategy_manager.get_iceberg_order_parent(None, slice.slice_message_id)
 
     # When
-    strategy_manager.cancel(order_id)
+    asyncio.run(strategy_manager.on_create_resp(exchange_create_response))
 
     # Then
-    assert strategy_manager.orders[order_id]["state"] == State.CancelSent
+    assert strategy_manager.get_iceberg_order_parent(DEFAULT_ORDER_ID) == order_id
 
-    strategy_manager.on_cancel_resp(exchange_cancel_response)
+    # When
+    asyncio.run(strategy_manager.cancel(order_id))
+    asyncio.run(strategy_manager.on_cancel_resp(exchange_cancel_response))
 
-    assert strategy_manager.orders[order_id]["state"] == State.Cancelled
+    # Then
+    assert strategy_manager.get_iceberg_order_parent(DEFAULT_ORDER_ID) == order_id
+    assert strategy_manager.get_iceberg_order_parent("unknown") is None
+
+
+@pytest.mark.usefixtures("sample_iceberg_order")
+def test_print_status_splits_completed_and_pending(
+    order_id, strategy_manager, exchange_create_response, exchange_cancel_response
+):
+    # Given
+    asyncio.run(strategy_manager.on_create_resp(exchange_create_response))
+    asyncio.run(strategy_manager.cancel(order_id))
+    asyncio.run(strategy_manager.on_cancel_resp(exchange_cancel_response))
+    asyncio.run(
+        strategy_manager.create_iceberg(
+            side=DEFAULT_SIDE,
+            quantity=DEFAULT_QTY,
+            limit_price=DEFAULT_PRICE,
+            slice_size=DEFAULT_SLICE_SIZE,
+        )
+    )
+
+    # Then
+    assert [order.parent_id for order in strategy_manager._completed] == [order_id]
+    assert [order.state for order in strategy_manager._pending] == [State.Sent]
+
+
+@pytest.mark.usefixtures("sample_iceberg_order")
+def test_responses_for_completed_parent_are_ignored(
+    order_id, strategy_manager, exchange_create_response, caplog
+):
+    # Given
+    fill = {
+        **exchange_create_response,
+        "name": "FillOrderResponse",
+        "order_params": {
+            **exchange_create_response["order_params"],
+            "filled_quantity": DEFAULT_SLICE_SIZE,
+            "status": "filled",
+        },
+        "status_msg": "Order filled successfully",
+    }
+    asyncio.run(strategy_manager.on_create_resp(exchange_create_response))
+    asyncio.run(strategy_manager.on_fill_resp(fill))
+    parent = strategy_manager.orders[order_id]
+    assert parent.state == State.Filled
+
+    # When
+    with caplog.at_level(logging.DEBUG, logger="client.strategy_manager"):
+        asyncio.run(strategy_manager.on_fill_resp(fill))
+
+    # Then
+    assert parent.state == State.Filled
+    assert parent.filled_quantity == DEFAULT_QTY
+    assert parent.iceberg_order.filled_quantity == DEFAULT_QTY
+    assert "Ignoring" in caplog.text
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+@pytest.mark.usefixtures("sample_iceberg_order")
+def test_create_many_flushes_the_first_slices_together(strategy_manager):
+    # Given
+    orders = [
+        (Side.Buy, DEFAULT_QTY, DEFAULT_PRICE, DEFAULT_SLICE_SIZE),
+        (Side.Sell, DEFAULT_QTY, DEFAULT_REVISED_PRICE, DEFAULT_SLICE_SIZE),
+    ]
+
+    # When
+    asyncio.run(strategy_manager.create_many(orders))
+
+    # Then
+    client = strategy_manager.client
+    assert client.send_create_order_request.await_count == 2
+    client.force_flush.assert_awaited_once_with()
+    assert [order.side for order in strategy_manager.orders.values()] == [
+        Side.Buy,
+        Side.Sell,
+    ]
@@ -0,0 +1,79 @@
+import asyncio
+from unittest import mock
+
+import orjson
+import zmq
+import zmq.asyncio
+
+from client.zmq_transport import ZmqTransport
+
+URL = "inproc://test-zmq-transport"
+
+
+def test_messages_round_trip_through_router():
+    # Given
+    context = zmq.asyncio.Context()
+    router = context.socket(zmq.ROUTER)
+    router.bind(URL)
+    transport = ZmqTransport(context)
+    on_connect = mock.AsyncMock()
+    on_create_resp = mock.AsyncMock()
+    catch_all = mock.AsyncMock()
+    transport.on("connect", on_connect)
+    transport.on("create_resp", on_create_resp)
+    transport.on("*", catch_all)
+
+    async def exchange_messages():
+        await transport.connect(URL, "client")
+        await transport.emit("create_batch", [{"client_msg_id": "1"}])
+        identity, event, payload = await router.recv_multipart()
+        await router.send_multipart(
+            [identity, b"create_resp", orjson.dumps({"client_msg_id": "1"})]
+        )
+        await router.send_multipart([identity, b"unknown", orjson.dumps({})])
+        await asyncio.sleep(0.05)
+        await transport.disconnect()
+        return event, orjson.loads(payload)
+
+    # When
+    event, data = asyncio.run(exchange_messages())
+
+    # Then
+    assert event == b"create_batch"
+    assert data == [{"client_msg_id": "1"}]
+    on_connect.assert_awaited_once_with()
+    on_create_resp.assert_awaited_once_with({"client_msg_id": "1"})
+    catch_all.assert_awaited_once_with("unknown", {})
+    router.close()
+    context.term()
+
+
+def test_malformed_messages_do_not_stop_the_receiver(caplog):
+    # Given
+    context = zmq.asyncio.Context()
+    router = context.socket(zmq.ROUTER)
+    router.bind(URL)
+    transport = ZmqTransport(context)
+    on_create_resp = mock.AsyncMock()
+    transport.on("create_resp", on_create_resp)
+
+    async def exchange_messages():
+        await transport.connect(URL, "client")
+        await transport.emit("create", {"client_msg_id": "1"})
+        identity, _, _ = await router.recv_multipart()
+        await router.send_multipart([identity, b"create_resp"])
+        await router.send_multipart([identity, b"create_resp", b"{not json"])
+        await router.send_multipart(
+            [identity, b"create_resp", orjson.dumps({"client_msg_id": "1"})]
+        )
+        await asyncio.sleep(0.05)
+        await transport.disconnect()
+
+    # When
+    asyncio.run(exchange_messages())
+
+    # Then
+    on_create_resp.assert_awaited_once_with({"client_msg_id": "1"})
+    assert caplog.text.count("Failed to handle message") == 2
+    router.close()
+    context.term()
@@ -1,23 +1,41 @@
+import asyncio
 import logging
+import threading
+from typing import Any, Coroutine, List, Tuple
 
 import socketio
 
+from message import serialization
 from message.message import Side
 
 from .exchange_client import ExchangeClient
 from .globals import ORDER_SIDES
 from .strategy_manager import StrategyManager
+from .transport import SocketIOTransport
 
-client = ExchangeClient(socketio.Client())
+# The exchange client and the strategy manager live on a dedicated event loop
+# thread. The functions below are synchronous entry points for the interactive
+# shell and hand their work over to that loop.
+loop = asyncio.new_event_loop()
+threading.Thread(target=loop.run_forever, name="trading-app-loop", daemon=True).start()
+
+client = ExchangeClient(SocketIOTransport(socketio.AsyncClient(json=serialization)))
 strategy_manager = StrategyManager(client)
-client.connect()
 logger = logging.getLogger(__name__)
 
 
-def status(order_id=None) -> None:
+def _run(coro: Coroutine) -> Any:
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+async def _print_status(order_id=None) -> None:
     strategy_manager.print_status(order_id)
 
 
+def status(order_id=None) -> None:
+    _run(_print_status(order_id))
+
+
 def create_iceberg(
     side: Side, quantity: int, limit_price: float, slice_size: int
 ) -> None:
@@ -25,20 +43,32 @@ def create_iceberg(
         logger.error("Order can only be of types %s, got %s", ORDER_SIDES, side)
         return
 
-    strategy_manager.create_iceberg(side, quantity, limit_price, slice_size)
+    _run(strategy_manager.create_iceberg(side, quantity, limit_price, slice_size))
+
+
+def create_icebergs(orders: List[Tuple[Side, int, float, int]]) -> None:
+    for order in orders:
+        if order[0] not in ORDER_SIDES:
+            logger.error("Order can only be of types %s, got %s", ORDER_SIDES, order[0])
+            return
+
+    _run(strategy_manager.create_many(orders))
 
 
 def revise(order_id: str, revised_quantity: int, revised_price: float) -> None:
-    strategy_manager.revise(order_id, revised_quantity, revised_price)
+    _run(strategy_manager.revise(order_id, revised_quantity, revised_price))
 
 
 def cancel(order_id: str) -> None:
-    strategy_manager.cancel(order_id)
+    _run(strategy_manager.cancel(order_id))
 
 
 def connect() -> None:
-    client.connect()
+    _run(client.connect())
 
 
 def disconnect() -> None:
-    client.disconnect()
+    _run(client.disconnect())
+
+
+connect()
@@ -0,0 +1,43 @@
+from typing import Any, Callable, Protocol
+
+import socketio
+
+
+class Transport(Protocol):
+    """The link between the exchange client and the exchange.
+
+    Besides the exchange responses, handlers can be registered for the
+    connection events "connect", "disconnect" and "connect_error" and for the
+    catch-all event "*", which receives the event name and its data.
+    """
+
+    # The exchange address used when the client is not given one
+    default_url: str
+
+    async def connect(self, url: str, client_id: str) -> None: ...
+
+    async def disconnect(self) -> None: ...
+
+    async def emit(self, event: str, data: Any) -> None: ...
+
+    def on(self, event: str, handler: Callable) -> None: ...
+
+
+class SocketIOTransport:
+    default_url = "http://127.0.0.1:5000"
+
+    def __init__(self, socketio_client: socketio.AsyncClient):
+        self._sio = socketio_client
+
+    async def connect(self, url: str, client_id: str) -> None:
+        # The exchange puts the connection in the room of the client ID
+        await self._sio.connect(url, auth={"client_id": client_id})
+
+    async def disconnect(self) -> None:
+        await self._sio.disconnect()
+
+    async def emit(self, event: str, data: Any) -> None:
+        await self._sio.emit(event, data)
+
+    def on(self, event: str, handler: Callable) -> None:
+        self._sio.on(event, handler)
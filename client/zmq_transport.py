@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+import zmq
+import zmq.asyncio
+
+logger = logging.getLogger(__name__)
+
+SEND_HIGH_WATER_MARK = 10_000
+
+
+class ZmqTransport:
+    """Talks to the ZeroMQ gateway of the simulator over a DEALER socket.
+
+    Every message is a two frame multipart message, the event name followed by
+    the orjson encoded data.
+    """
+
+    default_url = "tcp://127.0.0.1:5555"
+
+    def __init__(self, context: Optional[zmq.asyncio.Context] = None):
+        self._context = context or zmq.asyncio.Context.instance()
+        self._socket: Optional[zmq.asyncio.Socket] = None
+        self._receiver: Optional[asyncio.Task] = None
+        self._handlers: Dict[str, Callable] = {}
+
+    async def connect(self, url: str, client_id: str) -> None:
+        # The gateway learns the client ID from the requests themselves
+        self._socket = self._context.socket(zmq.DEALER)
+        self._socket.setsockopt(zmq.SNDHWM, SEND_HIGH_WATER_MARK)
+        self._socket.setsockopt(zmq.LINGER, 0)
+        self._socket.connect(url)
+        self._receiver = asyncio.create_task(self._receive())
+        await self._dispatch_connection_event("connect")
+
+    async def disconnect(self) -> None:
+        if self._socket is None:
+            return
+        self._receiver.cancel()
+        self._socket.close()
+        self._socket = self._receiver = None
+        await self._dispatch_connection_event("disconnect")
+
+    async def emit(self, event: str, data: Any) -> None:
+        await self._socket.send_multipart([event.encode(), orjson.dumps(data)])
+
+    def on(self, event: str, handler: Callable) -> None:
+        self._handlers[event] = handler
+
+    async def _dispatch_connection_event(self, event: str) -> None:
+        handler = self._handlers.get(event)
+        if handler:
+            await handler()
+
+    async def _receive(self) -> None:
+        while True:
+            frames = await self._socket.recv_multipart()
+            # A bad message is dropped, the connection keeps receiving
+            try:
+                event, payload = frames
+                event, data = event.decode(), orjson.loads(payload)
+                handler = self._handlers.get(event)
+                if handler:
+                    await handler(data)
+                elif "*" in self._handlers:
+                    await self._handlers["*"](event, data)
+            except Exception:
+                logger.exception("Failed to handle message %s", frames)
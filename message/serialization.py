@@ -0,0 +1,18 @@
+"""orjson backed drop-in for the ``json`` module of python-socketio.
+
+python-socketio and python-engineio pass ``json.dumps`` keyword arguments such
+as ``separators`` and expect a ``str`` back. orjson always produces compact
+output, so the keyword arguments are ignored.
+"""
+
+from typing import Any
+
+import orjson
+
+
+def dumps(obj: Any, **kwargs) -> str:
+    return orjson.dumps(obj).decode()
+
+
+def loads(s: str | bytes, **kwargs) -> Any:
+    return orjson.loads(s)
@@ -1,13 +1,22 @@
 import logging
+from collections import defaultdict
 
 from flask import Flask, render_template
 from flask_socketio import SocketIO, emit, join_room
 
+from message import serialization
+
 from .order import Side
 from .order_book import OrderBook
 
 app = Flask(__name__)
-socketio = SocketIO(app, async_mode=None, logger=True, engineio_logger=True)
+socketio = SocketIO(
+    app,
+    async_mode="eventlet",
+    json=serialization,
+    logger=True,
+    engineio_logger=True,
+)
 order_book = OrderBook()
 logger = logging.getLogger(__name__)
 
@@ -18,13 +27,79 @@ def market():
     return render_template("market_depth.html", **context)
 
 
+@socketio.on("connect")
+def handle_connect(auth):
+    client_id = (auth or {}).get("client_id")
+    if not client_id:
+        logger.warning("Connection without a client ID, no responses will be sent")
+        return
+    # Responses are emitted to the room of the client ID they belong to
+    join_room(client_id)
+
+
 @socketio.on("create")
 def handle_create(request):
-    logging.info("Received Create Order request: %s", request)
+    create_resp, fill_resp = create_order(request)
+    send_responses("create_resp", create_resp)
+    send_responses("fill_resp", fill_resp)
+
 
-    room_id = get_room_id(request)
+@socketio.on("revise")
+def handle_revise(request):
+    send_responses("revise_resp", revise_order(request))
 
-    create_resp, fill_resp = order_book.create_order_request(
+
+@socketio.on("cancel")
+def handle_cancel(request):
+    send_responses("cancel_resp", cancel_order(request))
+
+
+# The batch handlers match the whole batch first and then send every kind of
+# response once for the batch. A bad request is logged and skipped so that the
+# responses of the others are still sent.
+
+
+@socketio.on("create_batch")
+def handle_create_batch(requests):
+    create_resp, fill_resp = [], []
+    for request in requests:
+        try:
+            created, filled = create_order(request)
+        except Exception:
+            logger.exception("Failed to handle create request %s", request)
+            continue
+        create_resp.extend(created)
+        fill_resp.extend(filled)
+    send_responses("create_resp", create_resp)
+    send_responses("fill_resp", fill_resp)
+
+
+@socketio.on("revise_batch")
+def handle_revise_batch(requests):
+    revise_resp = []
+    for request in requests:
+        try:
+            revise_resp.extend(revise_order(request))
+        except Exception:
+            logger.exception("Failed to handle revise request %s", request)
+    send_responses("revise_resp", revise_resp)
+
+
+@socketio.on("cancel_batch")
+def handle_cancel_batch(requests):
+    cancel_resp = []
+    for request in requests:
+        try:
+            cancel_resp.extend(cancel_order(request))
+        except Exception:
+            logger.exception("Failed to handle cancel request %s", request)
+    send_responses("cancel_resp", cancel_resp)
+
+
+def create_order(request):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received Create Order request: %s", request)
+    return order_book.create_order_request(
         side=Side(request["side"]),
         client_msg_id=request["client_msg_id"],
         quantity=request["quantity"],
@@ -32,55 +107,42 @@ def handle_create(request):
         client_id=request["client_id"],
     )
 
-    for resp in create_resp:
-        logging.info("Sending create_resp: %s", resp)
-        send_response("create_resp", resp, room_id)
-    for resp in fill_resp:
-        logging.info("Sending fill_resp: %s", resp)
-        send_response("fill_resp", resp, room_id)
-
 
-@socketio.on("revise")
-def handle_revise(request):
-    logging.info("Received Revise Order request: %s", request)
-    room_id = get_room_id(request)
-    revise_resp = order_book.revise_order_request(
+def revise_order(request):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received Revise Order request: %s", request)
+    return order_book.revise_order_request(
         client_msg_id=request.get("client_msg_id"),
         client_id=request["client_id"],
         order_id=request.get("order_id"),
         revised_quantity=request.get("revised_quantity"),
         revised_price=request.get("revised_price"),
     )
-    for resp in revise_resp:
-        logging.info("Sending revise_resp: %s", resp)
-        send_response("revise_resp", resp, room_id)
 
 
-@socketio.on("cancel")
-def handle_cancel(request):
-    logging.info("Received Cancel Order Request: %s", request)
-    room_id = get_room_id(request)
-    cancel_resp = order_book.cancel_order_request(
+def cancel_order(request):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received Cancel Order Request: %s", request)
+    return order_book.cancel_order_request(
         client_msg_id=request.get("client_msg_id"),
         client_id=request["client_id"],
         order_id=request.get("order_id"),
     )
-    for resp in cancel_resp:
-        logging.info("Sending cancel_resp: %s", resp)
-        send_response("cancel_resp", resp, room_id)
-
-
-def get_room_id(request):
-    room_id = request.get("client_id", None)
-    join_room(room_id)
-    return room_id
 
 
-def send_response(msg, order_response, request_client_id):
-    response_client_id = getattr(order_response, "client_id", None)
+def send_responses(msg, order_responses):
+    responses_by_client = defaultdict(list)
+    for resp in order_responses:
+        responses_by_client[resp.client_id].append(resp.to_json())
 
-    if request_client_id == response_client_id:
-        emit(msg, order_response.to_json(), to=response_client_id)
+    for client_id, responses in responses_by_client.items():
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sending %s to %s: %s", msg, client_id, responses)
+        # A single response keeps the plain event, several go out as one batch
+        if len(responses) == 1:
+            emit(msg, responses[0], to=client_id)
+        else:
+            emit(f"{msg}_batch", responses, to=client_id)
 
 
 def initialize_order_book():
@@ -111,7 +173,7 @@ if __name__ == "__main__":
         filemode="w",
         format="%(asctime)s:%(levelname)s:%(module)s:%(lineno)d:%(message)s",
         encoding="utf-8",
-        level=logging.DEBUG,
+        level=logging.INFO,
     )
     initialize_order_book()
     socketio.run(app, host="127.0.0.1", port=5000, debug=True)
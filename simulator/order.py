@@ -1,10 +1,10 @@
+import itertools
 import logging
+import os
 import time
-import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
-from functools import total_ordering
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 
 from message.message import OrderStatus, Side
 
@@ -20,15 +20,26 @@ class TradeFillType(Enum):
     PartialFill = "Partial Fill"
 
 
-@dataclass
-class Trade:
+# Wire values of the enums, read once instead of on every message
+_SIDE_VALUES = {side: side.value for side in Side}
+_STATUS_VALUES = {status: status.value for status in OrderStatus}
+_FILL_TYPE_VALUES = {fill_type: fill_type.value for fill_type in TradeFillType}
+
+# Exchange order IDs are a random prefix of the process followed by a sequence
+# number, which saves reading from os.urandom for every order
+_ORDER_ID_PREFIX = os.urandom(4).hex()
+_order_id_seq = itertools.count()
+
+
+class Trade(NamedTuple):
     quantity: int
     limit_price: float
     symbol: str
     exch_order_id: str
     trade_id: str
-    fill_type: TradeFillType
-    side: Side
+    # Wire values of TradeFillType and Side
+    fill_type: str
+    side: str
 
     @classmethod
     def from_json(cls, json_msg: Dict):
@@ -38,23 +49,15 @@ class Trade:
             symbol=json_msg["symbol"],
             exch_order_id=json_msg["exch_order_id"],
             trade_id=json_msg["trade_id"],
-            fill_type=TradeFillType["fill_type"],
-            side=Side(json_msg["side"]),
+            fill_type=json_msg["fill_type"],
+            side=json_msg["side"],
         )
 
     def to_json(self):
-        return {
-            "quantity": self.quantity,
-            "limit_price": self.limit_price,
-            "symbol": self.symbol,
-            "exch_order_id": self.exch_order_id,
-            "trade_id": self.trade_id,
-            "fill_type": self.fill_type.value,
-            "side": self.side.value,
-        }
+        return self._asdict()
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderParams:
     limit_price: float
     quantity: int
@@ -76,11 +79,11 @@ class OrderParams:
         return {
             "limit_price": self.limit_price,
             "quantity": self.quantity,
-            "side": self.side.value,
+            "side": _SIDE_VALUES[self.side],
             "symbol": self.symbol,
             "filled_quantity": self.filled_quantity,
             "exch_order_id": self.exch_order_id,
-            "status": self.status.value,
+            "status": _STATUS_VALUES[self.status],
         }
 
     @classmethod
@@ -96,7 +99,7 @@ class OrderParams:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Response:
     client_id: str
     order_params: Optional[OrderParams]
@@ -104,7 +107,7 @@ class Response:
     status_msg: str
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderResponse(Response):
     client_msg_id: str
     name: str = "OrderResponse"
@@ -135,7 +138,7 @@ class OrderResponse(Response):
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class FillOrderResponse(Response):
     trade: Trade
     name: str = "FillOrderResponse"
@@ -161,8 +164,18 @@ class FillOrderResponse(Response):
         )
 
 
-@total_ordering
 class Order:
+    __slots__ = (
+        "_order_params",
+        "_timestamp",
+        "_client_msg_id",
+        "_trades",
+        "client_id",
+        "exch_order_id",
+        "side",
+        "symbol",
+    )
+
     def __init__(
         self,
         limit_price: float,
@@ -172,47 +185,40 @@ class Order:
         client_id: str,
         symbol: str = DEFAULT_SYMBOL,
     ):
+        # The fields that never change are kept on the order itself as well
+        self.exch_order_id: str = f"{_ORDER_ID_PREFIX}{next(_order_id_seq):012x}"
+        self.side = side
+        self.symbol = symbol
         self._order_params = OrderParams(
             limit_price=limit_price,
             quantity=quantity,
             side=side,
             symbol=symbol,
             filled_quantity=0,
-            exch_order_id=uuid.uuid4().hex,
+            exch_order_id=self.exch_order_id,
             status=OrderStatus.Ack,
         )
         self._timestamp = time.time()
 
-        self._client_id: str = client_id
+        self.client_id: str = client_id
         self._client_msg_id: str = client_msg_id
         self._trades: List[Trade] = []
 
     def __str__(self):
         return (
             f"client_msg_id: {self._client_msg_id}, timestamp: {self._timestamp}, "
-            f"order_params: {self._order_params}, client_id: {self._client_id}"
+            f"order_params: {self._order_params}, client_id: {self.client_id}"
         )
 
     def __hash__(self):
-        return self.exch_order_id
+        return hash(self.exch_order_id)
 
     def __eq__(self, other):
-        return self.exch_order_id == other.exch_order_id
-
-    def __lt__(self, other):
-        # Buy order(Bids) should be sorted in descending order
-        if self.side == Side.Buy and self.limit_price > other.limit_price:
-            return True
-
-        if self.side == Side.Sell and self.limit_price < other.limit_price:
-            return True
-
-        if self.limit_price == other.limit_price:
-            return self._timestamp < other._timestamp
-        return False
+        return isinstance(other, Order) and self.exch_order_id == other.exch_order_id
 
     def open_quantity(self):
-        return self.quantity - self.filled_quantity
+        order_params = self._order_params
+        return order_params.quantity - order_params.filled_quantity
 
     def revise(
         self,
@@ -230,7 +236,7 @@ class Order:
                 return OrderResponse(
                     client_msg_id=client_msg_id,
                     client_id=client_id,
-                    order_params=self._order_params,
+                    order_params=replace(self._order_params),
                     status=False,
                     status_msg=status_msg,
                 )
@@ -246,7 +252,7 @@ class Order:
                 return OrderResponse(
                     client_msg_id=client_msg_id,
                     client_id=client_id,
-                    order_params=self._order_params,
+                    order_params=replace(self._order_params),
                     status=False,
                     status_msg=status_msg,
                 )
@@ -257,7 +263,7 @@ class Order:
         return OrderResponse(
             client_msg_id=client_msg_id,
             client_id=client_id,
-            order_params=self._order_params,
+            order_params=replace(self._order_params),
             status=True,
             status_msg=status_msg,
         )
@@ -268,7 +274,7 @@ class Order:
             return OrderResponse(
                 client_msg_id=client_msg_id,
                 client_id=client_id,
-                order_params=self._order_params,
+                order_params=replace(self._order_params),
                 status=False,
                 status_msg=status_msg,
             )
@@ -278,7 +284,7 @@ class Order:
         return OrderResponse(
             client_msg_id=client_msg_id,
             client_id=client_id,
-            order_params=self._order_params,
+            order_params=replace(self._order_params),
             status=True,
             status_msg=status_msg,
         )
@@ -296,7 +302,8 @@ class Order:
         if self.open_quantity() == 0:
             fill_type = TradeFillType.CompleteFill
             self._order_params.status = OrderStatus.Filled
-            logger.info("Order: %s is filled", self._order_params)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Order: %s is filled", self._order_params)
         else:
             fill_type = TradeFillType.PartialFill
             self._order_params.status = OrderStatus.PartiallyFilled
@@ -306,23 +313,19 @@ class Order:
             limit_price=price,
             exch_order_id=self.exch_order_id,
             trade_id=trade_id,
-            fill_type=fill_type,
+            fill_type=_FILL_TYPE_VALUES[fill_type],
             symbol=self.symbol,
-            side=self.side,
+            side=_SIDE_VALUES[self.side],
         )
         self._trades.append(trade)
         return FillOrderResponse(
-            order_params=self._order_params,
-            client_id=self._client_id,
+            order_params=replace(self._order_params),
+            client_id=self.client_id,
             status=True,
             status_msg="Order filled successfully",
             trade=trade,
         )
 
-    @property
-    def client_id(self):
-        return self._client_id
-
     @property
     def order_params(self):
         return self._order_params
@@ -335,10 +338,6 @@ class Order:
     def quantity(self):
         return self._order_params.quantity
 
-    @property
-    def exch_order_id(self):
-        return self._order_params.exch_order_id
-
     @property
     def limit_price(self):
         return self._order_params.limit_price
@@ -347,20 +346,12 @@ class Order:
     def status(self):
         return self._order_params.status
 
-    @property
-    def side(self):
-        return self._order_params.side
-
-    @property
-    def symbol(self):
-        return self._order_params.symbol
-
 
 def ack_response(client_msg_id: str, client_id: str, order: Order):
     return OrderResponse(
         client_msg_id=client_msg_id,
         client_id=client_id,
-        order_params=order.order_params,
+        order_params=replace(order.order_params),
         status=True,
         status_msg="Successful order creation",
     )
@@ -1,11 +1,12 @@
-import copy
 import logging
-import time
+from collections import deque
 from dataclasses import dataclass
-from itertools import zip_longest
-from typing import Iterable, List, Optional, Tuple, TypedDict
+from itertools import count, zip_longest
+from operator import neg
+from typing import (Deque, Dict, Iterable, Iterator, List, Optional, Tuple,
+                    TypedDict)
 
-from sortedcontainers import SortedList
+from sortedcontainers import SortedDict
 
 from .order import (Order, OrderResponse, OrderStatus, Response, Side,
                     ack_response)
@@ -26,15 +27,75 @@ class PriceLevel:
     order_ids: List[str]
 
 
+class PriceLadder:
+    """The resting orders of one side of the book.
+
+    Orders are queued per price level in arrival order and the levels are sorted
+    best price first, which gives the price-time priority of the book.
+    """
+
+    def __init__(self, side: Side):
+        self.side = side
+        # Bids are keyed on the negated price so that the highest bid comes first
+        self.levels: SortedDict = SortedDict(neg) if side == Side.Buy else SortedDict()
+        # Exchange order ID -> price level and order
+        self.index: Dict[str, Tuple[float, Order]] = {}
+        # Price level -> open quantity of all the orders at that level
+        self.level_volume: Dict[float, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def depth(self) -> Iterator[Tuple[float, int]]:
+        for price in self.levels:
+            yield price, self.level_volume[price]
+
+    def best_level(self) -> Optional[Tuple[float, Deque[Order]]]:
+        if not self.levels:
+            return None
+        return self.levels.peekitem(0)
+
+    def add(self, order: Order) -> None:
+        price = order.limit_price
+        level: Optional[Deque[Order]] = self.levels.get(price)
+        if level is None:
+            level = self.levels[price] = deque()
+        level.append(order)
+        self.index[order.exch_order_id] = (price, order)
+        self.level_volume[price] = (
+            self.level_volume.get(price, 0) + order.open_quantity()
+        )
+
+    def change_volume(self, price: float, delta: int) -> None:
+        self.level_volume[price] += delta
+
+    def discard(self, order: Order) -> None:
+        entry = self.index.pop(order.exch_order_id, None)
+        if entry is None:
+            return
+        price, order = entry
+        level = self.levels[price]
+        if level[0] is order:
+            level.popleft()
+        else:
+            level.remove(order)
+        if not level:
+            del self.levels[price]
+            del self.level_volume[price]
+        else:
+            self.level_volume[price] -= order.open_quantity()
+
+
 @dataclass
 class OrderBook:
     def __init__(self, symbol: str = DEFAULT_ORDER_BOOK_SYMBOL):
-        self.order_book_dict = {
-            "asks": SortedList([]),
-            "bids": SortedList([]),
-            "completed_orders": {},
-            "symbol": symbol,
-        }
+        self.asks = PriceLadder(Side.Sell)
+        self.bids = PriceLadder(Side.Buy)
+        self.completed_orders: Dict[str, Order] = {}
+        self.symbol = symbol
+        self._own_side = {Side.Buy: self.bids, Side.Sell: self.asks}
+        self._cross_side = {Side.Buy: self.asks, Side.Sell: self.bids}
+        self._trade_seq = count(1)
 
     def create_order_request(
         self,
@@ -48,12 +109,12 @@ class OrderBook:
             limit_price=limit_price,
             quantity=quantity,
             side=side,
-            symbol=self.order_book_dict["symbol"],
+            symbol=self.symbol,
             client_msg_id=client_msg_id,
             client_id=client_id,
         )
         create_responses: List[OrderResponse] = [
-            copy.deepcopy(ack_response(client_msg_id, client_id, order))
+            ack_response(client_msg_id, client_id, order)
         ]
         fill_responses: List[Response] = self._evaluate_order_match(order)
         return create_responses, fill_responses
@@ -68,12 +129,18 @@ class OrderBook:
     ) -> List[Response]:
         try:
             order = self._validated_order(order_id)
+            ladder = self._ladder(order)
+            booked_price, booked_quantity = order.limit_price, order.open_quantity()
             revise_resp = order.revise(
                 client_msg_id=client_msg_id,
                 client_id=client_id,
                 revised_qty=revised_quantity,
                 revised_price=revised_price,
             )
+            ladder.change_volume(booked_price, order.open_quantity() - booked_quantity)
+            if order.limit_price != booked_price:
+                # A new price loses the time priority, the order is queued again
+                ladder.discard(order)
             fill_resp = self._evaluate_order_match(order)
             fill_resp.insert(0, revise_resp)
             return fill_resp
@@ -94,7 +161,7 @@ class OrderBook:
         try:
             order = self._validated_order(order_id)
             cancel_msg = order.cancel(client_msg_id=client_msg_id, client_id=client_id)
-            self._update_order_book(order, [], [])
+            self._update_order_book(order)
             return [cancel_msg]
 
         except ValueError as err:
@@ -112,21 +179,14 @@ class OrderBook:
         pass
 
     def get_market_depth(self) -> List:
-        bid_market_depth = []
-        ask_market_depth = []
-        market_depth = []
-        bids = self.order_book_dict.get("bids", SortedList([]))
-        for bid in bids:
-            bid_market_depth = OrderBook._build_market_depth(
-                order=bid, market_depth=bid_market_depth
-            )
-
-        asks = self.order_book_dict.get("asks", SortedList([]))
-        for ask in asks:
-            ask_market_depth = OrderBook._build_market_depth(
-                order=ask, market_depth=ask_market_depth
-            )
+        bid_market_depth = [
+            {"bid": price, "bid_volume": volume} for price, volume in self.bids.depth()
+        ]
+        ask_market_depth = [
+            {"ask": price, "ask_volume": volume} for price, volume in self.asks.depth()
+        ]
 
+        market_depth = []
         for bid_depth, ask_depth in zip_longest(bid_market_depth, ask_market_depth):
             market_depth_elem = {
                 "bid": "",
@@ -138,111 +198,88 @@ class OrderBook:
                 market_depth_elem.update(bid_depth)
             if ask_depth:
                 market_depth_elem.update(ask_depth)
-            if market_depth_elem["bid"] != "" or market_depth_elem["ask"] != "":
-                market_depth.append(market_depth_elem)
-        return market_depth
-
-    @staticmethod
-    def _build_market_depth(order: Order, market_depth: List):
-        key = "bid" if order.side == Side.Buy else "ask"
-        key_volume = f"{key}_volume"
-        prev_elem = market_depth[-1] if len(market_depth) > 0 else None
-        if prev_elem and order.limit_price == prev_elem[key]:
-            prev_elem[key_volume] = prev_elem[key_volume] + order.open_quantity()
-        else:
-            market_depth_row = {
-                key: order.limit_price,
-                key_volume: order.open_quantity(),
-            }
-            market_depth.append(market_depth_row)
+            market_depth.append(market_depth_elem)
         return market_depth
 
     def _evaluate_order_match(self, order: Order) -> List[Response]:
         responses: List[Response] = []
 
-        cross_quotes = self._cross_quote_list(order)
-        completed_quote_list = []
-        for quote in cross_quotes:
-            if order.status == OrderStatus.Filled:
+        cross_ladder = self._cross_ladder(order)
+        order_params = order.order_params
+        # The price is checked once per level, the orders of a level all match
+        while order_params.status != OrderStatus.Filled:
+            best_level = cross_ladder.best_level()
+            if best_level is None:
                 break
+            level_price, level = best_level
             price_matched = (
-                quote.limit_price >= order.limit_price
+                level_price >= order_params.limit_price
                 if order.side == Side.Sell
-                else quote.limit_price <= order.limit_price
-            )
-            logger.info(
-                "Order: %s Quote: %s Price matched %s", order, quote, price_matched
+                else level_price <= order_params.limit_price
             )
-
-            if price_matched:
-                fill_qty = (
-                    order.open_quantity()
-                    if quote.open_quantity() >= order.open_quantity()
-                    else quote.open_quantity()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Order: %s Level: %s Price matched %s",
+                    order,
+                    level_price,
+                    price_matched,
                 )
-                trade_id = f"FillId-{time.time()}"
-                trade_price = order.limit_price
-                try:
-                    fill_response = copy.deepcopy(
-                        order.fill(fill_qty, trade_price, trade_id)
-                    )
-                    responses.append(fill_response)
-                    cross_fill_response = quote.fill(fill_qty, trade_price, trade_id)
-                    responses.append(cross_fill_response)
-                except ValueError as err:
-                    logger.warning(str(err))
-                if quote.status == OrderStatus.Filled:
-                    completed_quote_list.append(quote)
-            else:
+            if not price_matched or not self._fill_level(
+                order, cross_ladder, level_price, level, responses
+            ):
                 break
-        self._update_order_book(order, completed_quote_list, cross_quotes)
+        self._update_order_book(order)
         return responses
 
-    def _update_order_book(
+    def _fill_level(
         self,
         order: Order,
-        completed_cross_quotes: List[Order],
-        cross_quotes: SortedList[Order],
-    ) -> None:
-        for cross_quote in completed_cross_quotes:
-            cross_quotes.remove(cross_quote)
-            self.order_book_dict["completed_orders"][
-                cross_quote.exch_order_id
-            ] = cross_quote
-
-        for cross_quote in cross_quotes:
-            logger.info("Updated cross quote list %s", cross_quote)
-        quote_list = self._quotes_list(order)
+        cross_ladder: PriceLadder,
+        level_price: float,
+        level: Deque[Order],
+        responses: List[Response],
+    ) -> bool:
+        order_params = order.order_params
+        completed_orders = self.completed_orders
+        while level and order_params.status != OrderStatus.Filled:
+            quote = level[0]
+            fill_qty = min(order.open_quantity(), quote.open_quantity())
+            trade_id = f"FillId-{next(self._trade_seq)}"
+            trade_price = order_params.limit_price
+            try:
+                fill_response = order.fill(fill_qty, trade_price, trade_id)
+                responses.append(fill_response)
+                cross_fill_response = quote.fill(fill_qty, trade_price, trade_id)
+                responses.append(cross_fill_response)
+            except ValueError as err:
+                logger.warning(str(err))
+                return False
+            cross_ladder.change_volume(level_price, -fill_qty)
+            if quote.status != OrderStatus.Filled:
+                break
+            cross_ladder.discard(quote)
+            completed_orders[quote.exch_order_id] = quote
+        return True
 
+    def _update_order_book(self, order: Order) -> None:
+        ladder = self._ladder(order)
+        order_id = order.exch_order_id
         if order.status == OrderStatus.Filled or order.status == OrderStatus.Cancelled:
-            self.order_book_dict["completed_orders"][order.exch_order_id] = order
-            quote_list.discard(order)
-        else:
-            # Remove if same element existed already and insert again
-            quote_list.discard(order)
-            quote_list.add(order)
-
-    def _quotes_list(self, order: Order) -> SortedList[Order]:
-        return (
-            self.order_book_dict.get("bids", SortedList([]))
-            if order.side == Side.Buy
-            else self.order_book_dict.get("asks", SortedList([]))
-        )
+            ladder.discard(order)
+            self.completed_orders[order_id] = order
+        elif order_id not in ladder.index:
+            # New and re-priced orders join the back of their price level
+            ladder.add(order)
 
-    def _cross_quote_list(self, order: Order) -> SortedList[Order]:
-        return (
-            self.order_book_dict.get("asks", SortedList([]))
-            if order.side == Side.Buy
-            else self.order_book_dict.get("bids", SortedList([]))
-        )
+    def _ladder(self, order: Order) -> PriceLadder:
+        return self._own_side[order.side]
 
-    def _validated_order(self, order_id: str):
+    def _cross_ladder(self, order: Order) -> PriceLadder:
+        return self._cross_side[order.side]
 
-        completed_order = self.order_book_dict.get("completed_orders", {}).get(
-            order_id, None
-        )
+    def _validated_order(self, order_id: str):
 
-        if completed_order:
+        if order_id in self.completed_orders:
             raise ValueError(f"Completed Order id: {order_id} cannot be updated")
 
         order = self._get_order(order_id)
@@ -250,15 +287,6 @@ class OrderBook:
             raise ValueError(f"Order id: {order_id} does not exist in the order book")
         return order
 
-    def _all_quotes(self) -> List:
-        all_quotes = []
-        all_quotes.extend(self.order_book_dict.get("asks", SortedList([])))
-        all_quotes.extend(self.order_book_dict.get("bids", SortedList([])))
-        return all_quotes
-
     def _get_order(self, order_id: str) -> Optional[Order]:
-        all_quotes = self._all_quotes()
-        for quote in all_quotes:
-            if order_id == quote.exch_order_id:
-                return quote
-        return None
+        entry = self.bids.index.get(order_id) or self.asks.index.get(order_id)
+        return entry[1] if entry else None
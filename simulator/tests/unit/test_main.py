@@ -0,0 +1,78 @@
+import pytest
+
+from simulator import main
+from simulator.order_book import OrderBook
+
+DEFAULT_CLIENT_ID = "TestClient"
+
+
+@pytest.fixture(autouse=True)
+def order_book(monkeypatch) -> OrderBook:
+    order_book = OrderBook()
+    monkeypatch.setattr(main, "order_book", order_book)
+    return order_book
+
+
+def connect(client_id=DEFAULT_CLIENT_ID):
+    return main.socketio.test_client(main.app, auth={"client_id": client_id})
+
+
+def create_request(
+    client_msg_id, side, quantity, limit_price, client_id=DEFAULT_CLIENT_ID
+):
+    return {
+        "client_msg_id": client_msg_id,
+        "client_id": client_id,
+        "side": side,
+        "quantity": quantity,
+        "limit_price": limit_price,
+    }
+
+
+def test_bad_request_in_a_batch_only_loses_itself(order_book):
+    # Given
+    client = connect()
+
+    # When
+    client.emit(
+        "create_batch",
+        [
+            create_request("good", "buy", 2, 50.0),
+            create_request("bad", "BUY", 2, 50.0),
+            create_request("other", "buy", 3, 49.0),
+        ],
+    )
+
+    # Then
+    (received,) = client.get_received()
+    assert received["name"] == "create_resp_batch"
+    assert [resp["client_msg_id"] for resp in received["args"][0]] == [
+        "good",
+        "other",
+    ]
+    assert order_book.get_market_depth() == [
+        {"bid": 50.0, "bid_volume": 2, "ask": "", "ask_volume": ""},
+        {"bid": 49.0, "bid_volume": 3, "ask": "", "ask_volume": ""},
+    ]
+
+
+def test_fills_are_sent_only_to_the_client_of_the_order():
+    # Given
+    buyer, seller, anonymous = connect("Buyer"), connect("Seller"), connect(None)
+    buyer.emit("create", create_request("bid", "buy", 5, 100.0, "Buyer"))
+    buyer.get_received()
+
+    # When
+    seller.emit("create", create_request("ask", "sell", 3, 100.0, "Seller"))
+
+    # Then
+    (buyer_fill,) = buyer.get_received()
+    assert buyer_fill["name"] == "fill_resp"
+    assert buyer_fill["args"][0]["client_id"] == "Buyer"
+    assert buyer_fill["args"][0]["trade"]["side"] == "buy"
+    seller_create, seller_fill = seller.get_received()
+    assert seller_create["name"] == "create_resp"
+    assert seller_fill["name"] == "fill_resp"
+    assert seller_fill["args"][0]["client_id"] == "Seller"
+    assert seller_fill["args"][0]["trade"]["side"] == "sell"
+    assert anonymous.get_received() == []
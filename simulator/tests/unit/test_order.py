@@ -42,9 +42,9 @@ def test_complete_fill_success(order):
         limit_price=expected_price,
         exch_order_id=order.exch_order_id,
         trade_id=expected_trade_id,
-        fill_type=TradeFillType.CompleteFill,
+        fill_type=TradeFillType.CompleteFill.value,
         symbol=DEFAULT_SYMBOL,
-        side=DEFAULT_SIDE,
+        side=DEFAULT_SIDE.value,
     )
 
     # When
@@ -91,9 +91,9 @@ def test_partial_fill_status(order):
         limit_price=DEFAULT_PRICE,
         exch_order_id=order.exch_order_id,
         trade_id=expected_trade_id,
-        fill_type=TradeFillType.PartialFill,
+        fill_type=TradeFillType.PartialFill.value,
         symbol=DEFAULT_SYMBOL,
-        side=DEFAULT_SIDE,
+        side=DEFAULT_SIDE.value,
     )
 
     # When
@@ -150,3 +150,58 @@ def test_filled_order_cannot_be_cancelled(order):
     # Then
     assert not cancel_response.status
     assert cancel_response.status_msg == "Filled order cannot be cancelled"
+
+
+def test_orders_are_hashed_by_exchange_order_id(order):
+    # Given
+    other_order = Order(
+        limit_price=DEFAULT_PRICE,
+        quantity=DEFAULT_QTY,
+        side=DEFAULT_SIDE,
+        client_msg_id=DEFAULT_MSG_ID,
+        client_id=DEFAULT_CLIENT_ID,
+    )
+
+    # When
+    orders = {order, other_order, order}
+
+    # Then
+    assert orders == {order, other_order}
+    assert len(orders) == 2
+    assert order != other_order
+    assert order != order.exch_order_id
+
+
+def test_trade_round_trips_through_json(order):
+    # Given
+    fill_response = order.fill(
+        quantity=DEFAULT_QTY,
+        price=DEFAULT_PRICE,
+        trade_id="test_trade_id",
+    )
+
+    # When
+    trade = Trade.from_json(fill_response.trade.to_json())
+
+    # Then
+    assert trade == fill_response.trade
+    assert trade.fill_type == TradeFillType.CompleteFill.value
+    assert trade.side == DEFAULT_SIDE.value
+
+
+def test_exchange_order_ids_are_unique(order):
+    # When
+    order_ids = [
+        Order(
+            limit_price=DEFAULT_PRICE,
+            quantity=DEFAULT_QTY,
+            side=DEFAULT_SIDE,
+            client_msg_id=DEFAULT_MSG_ID,
+            client_id=DEFAULT_CLIENT_ID,
+        ).exch_order_id
+        for _ in range(1000)
+    ]
+
+    # Then
+    assert len(set(order_ids + [order.exch_order_id])) == 1001
+    assert {order_id[:8] for order_id in order_ids} == {order.exch_order_id[:8]}
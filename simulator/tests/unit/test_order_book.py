@@ -0,0 +1,213 @@
+import pytest
+
+from simulator.order import OrderStatus, Side
+from simulator.order_book import OrderBook
+
+DEFAULT_CLIENT_ID = "TestClient"
+
+
+@pytest.fixture
+def order_book() -> OrderBook:
+    return OrderBook()
+
+
+def create_order(order_book, side, quantity, limit_price, client_msg_id="MsgId"):
+    create_resp, fill_resp = order_book.create_order_request(
+        side=side,
+        client_msg_id=client_msg_id,
+        client_id=DEFAULT_CLIENT_ID,
+        quantity=quantity,
+        limit_price=limit_price,
+    )
+    return create_resp[0].order_params.exch_order_id, fill_resp
+
+
+def test_orders_match_in_price_time_priority(order_book):
+    # Given
+    late_ask, _ = create_order(order_book, Side.Sell, 5, 101.0, "late")
+    early_ask, _ = create_order(order_book, Side.Sell, 5, 100.0, "early")
+    same_price_ask, _ = create_order(order_book, Side.Sell, 5, 100.0, "same")
+
+    # When
+    _, fill_resp = create_order(order_book, Side.Buy, 12, 101.0)
+
+    # Then
+    crossed = [resp.order_params.exch_order_id for resp in fill_resp[1::2]]
+    assert crossed == [early_ask, same_price_ask, late_ask]
+    assert [resp.trade.quantity for resp in fill_resp[1::2]] == [5, 5, 2]
+    assert order_book._get_order(late_ask).open_quantity() == 3
+    assert order_book._get_order(early_ask) is None
+
+
+def test_unmatched_order_rests_on_its_side(order_book):
+    # Given
+    create_order(order_book, Side.Sell, 5, 102.0)
+
+    # When
+    order_id, fill_resp = create_order(order_book, Side.Buy, 5, 101.0)
+
+    # Then
+    assert fill_resp == []
+    assert order_book._get_order(order_id).status == OrderStatus.Ack
+    assert order_book.get_market_depth() == [
+        {"bid": 101.0, "bid_volume": 5, "ask": 102.0, "ask_volume": 5}
+    ]
+
+
+def test_cancelled_order_leaves_the_book(order_book):
+    # Given
+    order_id, _ = create_order(order_book, Side.Buy, 5, 101.0)
+
+    # When
+    (cancel_resp,) = order_book.cancel_order_request("CancelId", "client", order_id)
+
+    # Then
+    assert cancel_resp.status
+    assert order_book._get_order(order_id) is None
+    assert order_book.get_market_depth() == []
+    assert not order_book.cancel_order_request("CancelId", "client", order_id)[0].status
+
+
+def test_market_depth_is_sorted_best_price_first(order_book):
+    # Given
+    for side, quantity, limit_price in [
+        (Side.Buy, 2, 98.0),
+        (Side.Buy, 3, 99.0),
+        (Side.Buy, 4, 98.0),
+        (Side.Sell, 1, 102.0),
+        (Side.Sell, 6, 101.0),
+    ]:
+        create_order(order_book, side, quantity, limit_price)
+
+    # When
+    market_depth = order_book.get_market_depth()
+
+    # Then
+    assert market_depth == [
+        {"bid": 99.0, "bid_volume": 3, "ask": 101.0, "ask_volume": 6},
+        {"bid": 98.0, "bid_volume": 6, "ask": 102.0, "ask_volume": 1},
+    ]
+
+
+def test_responses_hold_a_snapshot_of_the_order(order_book):
+    # Given
+    create_order(order_book, Side.Sell, 3, 100.0)
+    create_order(order_book, Side.Sell, 3, 100.0)
+
+    # When
+    create_resp, fill_resp = order_book.create_order_request(
+        side=Side.Buy,
+        client_msg_id="MsgId",
+        client_id=DEFAULT_CLIENT_ID,
+        quantity=6,
+        limit_price=100.0,
+    )
+
+    # Then
+    assert create_resp[0].order_params.status == OrderStatus.Ack
+    assert create_resp[0].order_params.filled_quantity == 0
+    assert [resp.order_params.filled_quantity for resp in fill_resp[::2]] == [3, 6]
+    assert [resp.order_params.status for resp in fill_resp[::2]] == [
+        OrderStatus.PartiallyFilled,
+        OrderStatus.Filled,
+    ]
+
+
+def test_market_depth_follows_fills_revisions_and_cancels(order_book):
+    # Given
+    ask_id, _ = create_order(order_book, Side.Sell, 5, 101.0)
+    other_ask_id, _ = create_order(order_book, Side.Sell, 4, 101.0)
+
+    # When
+    create_order(order_book, Side.Buy, 7, 101.0)
+
+    # Then
+    assert order_book.get_market_depth() == [
+        {"bid": "", "bid_volume": "", "ask": 101.0, "ask_volume": 2}
+    ]
+
+    # When
+    order_book.revise_order_request(
+        "ReviseId", DEFAULT_CLIENT_ID, other_ask_id, revised_quantity=6
+    )
+
+    # Then
+    assert order_book.get_market_depth() == [
+        {"bid": "", "bid_volume": "", "ask": 101.0, "ask_volume": 4}
+    ]
+
+    # When
+    order_book.cancel_order_request("CancelId", DEFAULT_CLIENT_ID, other_ask_id)
+
+    # Then
+    assert order_book._get_order(ask_id) is None
+    assert order_book.get_market_depth() == []
+
+
+def test_every_match_gets_its_own_trade_id(order_book):
+    # Given
+    for _ in range(3):
+        create_order(order_book, Side.Sell, 1, 100.0)
+
+    # When
+    _, fill_resp = create_order(order_book, Side.Buy, 3, 100.0)
+
+    # Then
+    trade_ids = [resp.trade.trade_id for resp in fill_resp]
+    assert trade_ids == [
+        "FillId-1",
+        "FillId-1",
+        "FillId-2",
+        "FillId-2",
+        "FillId-3",
+        "FillId-3",
+    ]
+
+
+def test_only_a_new_price_loses_the_time_priority(order_book):
+    # Given
+    first_ask, _ = create_order(order_book, Side.Sell, 5, 101.0)
+    second_ask, _ = create_order(order_book, Side.Sell, 5, 101.0)
+    third_ask, _ = create_order(order_book, Side.Sell, 5, 101.0)
+
+    # When
+    order_book.revise_order_request(
+        "ReviseId", DEFAULT_CLIENT_ID, first_ask, revised_quantity=8
+    )
+    order_book.revise_order_request(
+        "ReviseId", DEFAULT_CLIENT_ID, second_ask, revised_price=102.0
+    )
+    order_book.revise_order_request(
+        "ReviseId", DEFAULT_CLIENT_ID, second_ask, revised_price=101.0
+    )
+    _, fill_resp = create_order(order_book, Side.Buy, 18, 101.0)
+
+    # Then
+    crossed = [resp.order_params.exch_order_id for resp in fill_resp[1::2]]
+    assert crossed == [first_ask, third_ask, second_ask]
+    assert [resp.trade.quantity for resp in fill_resp[1::2]] == [8, 5, 5]
+    assert order_book.get_market_depth() == []
+
+
+def test_rejected_revise_keeps_the_time_priority(order_book):
+    # Given
+    first_ask, _ = create_order(order_book, Side.Sell, 5, 101.0)
+    second_ask, _ = create_order(order_book, Side.Sell, 5, 101.0)
+    create_order(order_book, Side.Buy, 3, 101.0)
+
+    # When
+    (revise_resp,) = order_book.revise_order_request(
+        "ReviseId",
+        DEFAULT_CLIENT_ID,
+        first_ask,
+        revised_quantity=1,
+        revised_price=102.0,
+    )
+    _, fill_resp = create_order(order_book, Side.Buy, 7, 101.0)
+
+    # Then
+    assert not revise_resp.status
+    crossed = [resp.order_params.exch_order_id for resp in fill_resp[1::2]]
+    assert crossed == [first_ask, second_ask]
+    assert [resp.trade.quantity for resp in fill_resp[1::2]] == [2, 5]
+    assert order_book.get_market_depth() == []
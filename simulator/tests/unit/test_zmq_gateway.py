@@ -0,0 +1,175 @@
+from unittest import mock
+
+import orjson
+import pytest
+import zmq
+
+from simulator import main, zmq_gateway
+from simulator.order_book import OrderBook
+
+
+class StopServing(BaseException):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def order_book(monkeypatch) -> OrderBook:
+    order_book = OrderBook()
+    monkeypatch.setattr(main, "order_book", order_book)
+    return order_book
+
+
+@pytest.fixture
+def socket():
+    return mock.Mock(spec=zmq.Socket)
+
+
+def message(identity, event, data):
+    return [identity, event.encode(), orjson.dumps(data)]
+
+
+def create_request(client_id, client_msg_id, side, quantity, limit_price):
+    return {
+        "client_msg_id": client_msg_id,
+        "client_id": client_id,
+        "side": side,
+        "quantity": quantity,
+        "limit_price": limit_price,
+    }
+
+
+def sent_messages(socket):
+    messages = [
+        (identity, event.decode(), orjson.loads(payload))
+        for identity, event, payload in (
+            call.args[0] for call in socket.send_multipart.call_args_list
+        )
+    ]
+    socket.send_multipart.reset_mock()
+    return messages
+
+
+def create_order(socket, identities, client_id, side, quantity, limit_price):
+    request = create_request(client_id, "Create", side, quantity, limit_price)
+    zmq_gateway.handle_message(
+        socket, identities, message(client_id.encode(), "create", request)
+    )
+    create_resp, *_ = sent_messages(socket)
+    return create_resp[2]["order_params"]["exch_order_id"]
+
+
+def test_create_is_answered_with_a_create_response(socket):
+    # When
+    zmq_gateway.handle_message(
+        socket, {}, message(b"A", "create", create_request("A", "1", "buy", 5, 100.0))
+    )
+
+    # Then
+    ((identity, event, data),) = sent_messages(socket)
+    assert (identity, event) == (b"A", "create_resp")
+    assert data["client_msg_id"] == "1"
+    assert data["status"]
+
+
+def test_revise_is_answered_with_a_revise_response(socket):
+    # Given
+    identities = {}
+    order_id = create_order(socket, identities, "A", "buy", 5, 100.0)
+
+    # When
+    zmq_gateway.handle_message(
+        socket,
+        identities,
+        message(
+            b"A",
+            "revise",
+            {
+                "client_msg_id": "2",
+                "client_id": "A",
+                "order_id": order_id,
+                "revised_quantity": 8,
+            },
+        ),
+    )
+
+    # Then
+    ((identity, event, data),) = sent_messages(socket)
+    assert (identity, event) == (b"A", "revise_resp")
+    assert data["status"]
+    assert data["order_params"]["quantity"] == 8
+
+
+def test_cancel_batch_is_answered_per_request(socket, order_book):
+    # Given
+    identities = {}
+    order_ids = [
+        create_order(socket, identities, "A", "buy", 5, limit_price)
+        for limit_price in (100.0, 99.0)
+    ]
+
+    # When
+    zmq_gateway.handle_message(
+        socket,
+        identities,
+        message(
+            b"A",
+            "cancel_batch",
+            [
+                {"client_msg_id": order_id, "client_id": "A", "order_id": order_id}
+                for order_id in order_ids
+            ],
+        ),
+    )
+
+    # Then
+    cancel_resp = sent_messages(socket)
+    assert [event for _, event, _ in cancel_resp] == ["cancel_resp"] * 2
+    assert [data["client_msg_id"] for _, _, data in cancel_resp] == order_ids
+    assert order_book.get_market_depth() == []
+
+
+def test_fills_are_routed_to_the_identity_of_each_client(socket):
+    # Given
+    identities = {}
+    create_order(socket, identities, "Seller", "sell", 3, 100.0)
+
+    # When
+    zmq_gateway.handle_message(
+        socket,
+        identities,
+        message(b"Buyer", "create", create_request("Buyer", "1", "buy", 5, 100.0)),
+    )
+
+    # Then
+    sent = [
+        (identity, event, data["client_id"])
+        for identity, event, data in sent_messages(socket)
+    ]
+    assert sent == [
+        (b"Buyer", "create_resp", "Buyer"),
+        (b"Buyer", "fill_resp", "Buyer"),
+        (b"Seller", "fill_resp", "Seller"),
+    ]
+
+
+def test_bad_messages_are_dropped_and_serving_goes_on(socket, monkeypatch, caplog):
+    # Given
+    context = mock.Mock(spec=zmq.Context)
+    context.socket.return_value = socket
+    monkeypatch.setattr(zmq.Context, "instance", lambda: context)
+    socket.recv_multipart.side_effect = [
+        [b"A", b"create"],
+        message(b"A", "create", create_request("A", "1", "BUY", 5, 100.0)),
+        message(b"A", "create", {"client_msg_id": "2"}),
+        message(b"A", "create", create_request("A", "3", "buy", 5, 100.0)),
+        StopServing,
+    ]
+
+    # When
+    with pytest.raises(StopServing):
+        zmq_gateway.serve("inproc://test-zmq-gateway")
+
+    # Then
+    ((identity, event, data),) = sent_messages(socket)
+    assert (identity, event, data["client_msg_id"]) == (b"A", "create_resp", "3")
+    assert caplog.text.count("Failed to handle message") == 3
@@ -0,0 +1,79 @@
+import logging
+
+import orjson
+import zmq
+
+from .main import (cancel_order, create_order, initialize_order_book,
+                   revise_order)
+
+logger = logging.getLogger(__name__)
+
+
+def handle_create(request):
+    create_resp, fill_resp = create_order(request)
+    return [("create_resp", resp) for resp in create_resp] + [
+        ("fill_resp", resp) for resp in fill_resp
+    ]
+
+
+def handle_revise(request):
+    return [("revise_resp", resp) for resp in revise_order(request)]
+
+
+def handle_cancel(request):
+    return [("cancel_resp", resp) for resp in cancel_order(request)]
+
+
+HANDLERS = {
+    "create": handle_create,
+    "revise": handle_revise,
+    "cancel": handle_cancel,
+}
+
+
+def handle_message(socket, identities, frames):
+    identity, event, payload = frames
+    event, data = event.decode(), orjson.loads(payload)
+    name, batch, _ = event.partition("_batch")
+    handler = HANDLERS.get(name)
+    if handler is None:
+        logger.warning("Received unknown event %s", event)
+        return
+
+    requests = data if batch else [data]
+    for request in requests:
+        identities[request["client_id"]] = identity
+        for resp_event, resp in handler(request):
+            client_identity = identities.get(resp.client_id)
+            if client_identity is None:
+                continue
+            socket.send_multipart(
+                [client_identity, resp_event.encode(), orjson.dumps(resp.to_json())]
+            )
+
+
+def serve(url: str = "tcp://127.0.0.1:5555") -> None:
+    socket = zmq.Context.instance().socket(zmq.ROUTER)
+    socket.bind(url)
+    # Client ID -> routing identity of the DEALER socket it last wrote from
+    identities = {}
+    logger.info("ZeroMQ gateway listening on %s", url)
+    while True:
+        frames = socket.recv_multipart()
+        # A bad message is dropped, like a failing Socket.IO event handler
+        try:
+            handle_message(socket, identities, frames)
+        except Exception:
+            logger.exception("Failed to handle message %s", frames)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        filename="exch_zmq_gateway.log",
+        filemode="w",
+        format="%(asctime)s:%(levelname)s:%(module)s:%(lineno)d:%(message)s",
+        encoding="utf-8",
+        level=logging.INFO,
+    )
+    initialize_order_book()
+    serve()